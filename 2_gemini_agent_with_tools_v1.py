@@ -1,5 +1,4 @@
-import urllib.request
-import xml.etree.ElementTree as ET
+from arxiv_core import sync as arxiv_sync
 from google import genai
 from google.genai import types
 from rich.console import Console
@@ -29,31 +28,8 @@ def fetch_arxiv_papers(topic: str, number_of_papers: int = 3) -> list:
         fetch_arxiv_papers("quantum computing", 2)
         # Returns: [{'arxiv_id': '...', 'title': '...', 'authors': [...], 'published': '...', 'pdf_link': '...'}, ...]
     """
-    search_query = f"all:{topic}"
-    url = f'http://export.arxiv.org/api/query?search_query={search_query}&start=0&max_results={number_of_papers}&sortBy=submittedDate&sortOrder=descending'
-    print(f"******* FUNCTION CALLED: Fetching papers from arXiv with URL: {url} *******")
-    with urllib.request.urlopen(url) as resp:
-        raw = resp.read()
-    
-    root = ET.fromstring(raw)
-    
-    papers = []
-    for entry in root.findall(".//{*}entry"):
-        full_id = entry.findtext("{*}id")
-        arxiv_id = full_id.split("/")[-1] if full_id else None 
-        title = entry.findtext("{*}title")
-        published = entry.findtext("{*}published")
-        authors = [a.findtext("{*}name") for a in entry.findall("{*}author")]
-        pdf_link = next((l.get("href") for l in entry.findall("{*}link") if l.get("type") == "application/pdf"), None)
-        papers.append({
-            'arxiv_id': arxiv_id,
-            'title': title,
-            'authors': authors,
-            'published': published,
-            'pdf_link': pdf_link
-        })
-    
-    return papers
+    # Fetching, parsing and caching are shared with the MCP servers (see arxiv_core)
+    return arxiv_sync.get_papers(topic, number_of_papers)
 
 def get_arxiv_abstract(arxiv_id:str) -> str | None:
     """
@@ -72,18 +48,8 @@ def get_arxiv_abstract(arxiv_id:str) -> str | None:
         get_arxiv_abstract("2301.12345")
         # Returns: "This paper discusses..."
     """
-    url = f'http://export.arxiv.org/api/query?id_list={arxiv_id}'
-    print(f"******* FUNCTION CALLED: Fetching paper abstract from arXiv with URL: {url} *******")
     try:
-        with urllib.request.urlopen(url) as resp:
-            raw = resp.read()
-        
-        root = ET.fromstring(raw)
-        entry = root.find(".//{*}entry")
-        if entry is not None:
-            return entry.findtext("{*}summary")
-        else:
-            return None
+        return arxiv_sync.get_abstract(arxiv_id)
     except Exception as e:
         print(f"Error fetching abstract: {e}")
         return None
@@ -1,11 +1,9 @@
-import urllib.request
-import xml.etree.ElementTree as ET
+from arxiv_core import save_markdown, sync as arxiv_sync
+from arxiv_core.agent import NO_AUTOMATIC_FUNCTION_CALLING, send_message
 from google import genai
 from google.genai import types
 from rich.console import Console
 from rich.markdown import Markdown
-import os
-import re
 
 
 def fetch_arxiv_papers(topic: str, number_of_papers: int = 3) -> list:
@@ -32,31 +30,8 @@ def fetch_arxiv_papers(topic: str, number_of_papers: int = 3) -> list:
         fetch_arxiv_papers("quantum computing", 2)
         # Returns: [{'arxiv_id': '...', 'title': '...', 'authors': [...], 'published': '...', 'pdf_link': '...'}, ...]
     """
-    search_query = f"all:{topic}"
-    url = f'http://export.arxiv.org/api/query?search_query={search_query}&start=0&max_results={number_of_papers}&sortBy=submittedDate&sortOrder=descending'
-    print(f"******* FUNCTION CALLED: Fetching papers from arXiv with URL: {url} *******")
-    with urllib.request.urlopen(url) as resp:
-        raw = resp.read()
-    
-    root = ET.fromstring(raw)
-    
-    papers = []
-    for entry in root.findall(".//{*}entry"):
-        full_id = entry.findtext("{*}id")
-        arxiv_id = full_id.split("/")[-1] if full_id else None 
-        title = entry.findtext("{*}title")
-        published = entry.findtext("{*}published")
-        authors = [a.findtext("{*}name") for a in entry.findall("{*}author")]
-        pdf_link = next((l.get("href") for l in entry.findall("{*}link") if l.get("type") == "application/pdf"), None)
-        papers.append({
-            'arxiv_id': arxiv_id,
-            'title': title,
-            'authors': authors,
-            'published': published,
-            'pdf_link': pdf_link
-        })
-    
-    return papers
+    # Fetching, parsing and caching are shared with the MCP servers (see arxiv_core)
+    return arxiv_sync.get_papers(topic, number_of_papers)
 
 def get_arxiv_abstract(arxiv_id:str) -> str | None:
     """
@@ -75,18 +50,8 @@ def get_arxiv_abstract(arxiv_id:str) -> str | None:
         get_arxiv_abstract("2301.12345")
         # Returns: "This paper discusses..."
     """
-    url = f'http://export.arxiv.org/api/query?id_list={arxiv_id}'
-    print(f"******* FUNCTION CALLED: Fetching paper abstract from arXiv with URL: {url} *******")
     try:
-        with urllib.request.urlopen(url) as resp:
-            raw = resp.read()
-        
-        root = ET.fromstring(raw)
-        entry = root.find(".//{*}entry")
-        if entry is not None:
-            return entry.findtext("{*}summary")
-        else:
-            return None
+        return arxiv_sync.get_abstract(arxiv_id)
     except Exception as e:
         print(f"Error fetching abstract: {e}")
         return None
@@ -116,29 +81,20 @@ def save_md_to_file(text: str, filename: str) -> None:
             md_content += f"## {paper['title']}\nAuthors: {', '.join(paper['authors'])}\nPublished: {paper['published']}\nPDF: {paper['pdf_link']}\nAbstract Summary: {abstracts[i][:200]}...\n\n"
         save_md_to_file(md_content, "mcp_papers_summary.md")
     """
-    print(f"******* FUNCTION CALLED: Saving Markdown to file: {filename} *******")
-    
-    # Create reports folder if it doesn't exist
-    os.makedirs("./reports", exist_ok=True)
-    
-    # Sanitize filename to avoid issues with special characters
-    filename = re.sub(r'[<>:"/\\|?*]', '-', filename)
-    if not filename.endswith('.md'):
-        filename += '.md'
-    
-    # Set path to ./reports
-    filepath = os.path.join("./reports", filename)
-    
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(text)
+        filepath = save_markdown(text, filename)
         print(f"File saved successfully: {filepath}")
     except Exception as e:
         print(f"Error saving file: {e}")
 
+tools = [fetch_arxiv_papers, get_arxiv_abstract, save_md_to_file]
+
 client = genai.Client()
 config = types.GenerateContentConfig(
-    tools=[fetch_arxiv_papers,get_arxiv_abstract,save_md_to_file]
+    tools=tools,
+    # The tool calls are run by send_message below, so that all calls of a model turn
+    # (e.g. get_arxiv_abstract for three papers) run in parallel instead of one after another
+    automatic_function_calling=NO_AUTOMATIC_FUNCTION_CALLING,
 )
 
 chat = client.chats.create(
@@ -149,7 +105,7 @@ chat = client.chats.create(
 user_prompt = """Prepare a report summarizing the research problems of the latest 3 papers
 from arXiv based on the topic MCP and save that report with the corresponding paper citations to a file."""
 print("User prompt:", user_prompt,"\n")
-response = chat.send_message(user_prompt)
+response = send_message(chat, user_prompt, tools)
 # Use Rich to render Markdown for better terminal display
 console = Console()
 md = Markdown(response.text)
@@ -1,15 +1,45 @@
 import asyncio
-from fastmcp import Client
+from arxiv_core.config import PARTIAL_RESULTS_LOGGER
+from arxiv_core.session import McpSession
+from fastmcp.client.logging import LogMessage, default_log_handler
 
-client = Client("4_mcp_server.py")
+# Long fetches stream their papers in batches before the final result arrives.
+# Print each batch as soon as it is received instead of waiting for the whole list.
+async def log_handler(message: LogMessage):
+    if message.logger == PARTIAL_RESULTS_LOGGER:
+        for paper in message.data["extra"]["papers"]:
+            print(f"  - {paper['arxiv_id']}: {paper['title']}")
+    else:
+        await default_log_handler(message)
+
+async def progress_handler(progress: float, total: float | None, message: str | None):
+    print(f"Progress: {message}")
+
+# One long-lived session: the server process is spawned and initialized once, and every
+# tool call below reuses it. If the server process dies, the session reconnects automatically.
+session = McpSession("4_mcp_server.py", log_handler=log_handler, progress_handler=progress_handler)
 
 # Example of calling a tool defined in the server
 # fetch_arxiv_papers(topic: str, number_of_papers: int = 3)
 async def call_tool_fetch(topic: str, number_of_papers: int):
-    async with client:
-        result = await client.call_tool("fetch_arxiv_papers", 
-                                        {"topic": topic, 
-                                         "number_of_papers": number_of_papers})      
-        print(result.structured_content)
+    result = await session.call_tool("fetch_arxiv_papers", 
+                                     {"topic": topic, 
+                                      "number_of_papers": number_of_papers})      
+    print(result.structured_content)
+
+# Example of calling several tools at once over the same session
+# Up to MCP_MAX_CONCURRENT_CALLS calls are in flight at a time; results come back in the order of `topics`
+async def call_tools_fetch(topics: list[str], number_of_papers: int):
+    results = await session.call_tools([("fetch_arxiv_papers", 
+                                         {"topic": topic, 
+                                          "number_of_papers": number_of_papers}) for topic in topics])
+    for topic, result in zip(topics, results):
+        print(topic, result.structured_content)
+
+async def main():
+    async with session:
+        await call_tool_fetch("MCP", 3)
+        # Runs over the same session, without starting a new server process
+        await call_tools_fetch(["RAG", "LLM agents", "tool calling"], 3)
 
-asyncio.run(call_tool_fetch("MCP", 3))
\ No newline at end of file
+asyncio.run(main())
\ No newline at end of file
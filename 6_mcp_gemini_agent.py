@@ -1,49 +1,62 @@
-from fastmcp import Client
+from arxiv_core.agent import NO_AUTOMATIC_FUNCTION_CALLING, gemini_tools, report_tool_summary_tokens, send_message_async, tool_summary
+from arxiv_core.config import MCP_REPORT_TOOL_TOKENS
+from arxiv_core.session import McpSession
 from google import genai
 import asyncio
 
-mcp_client = Client("4_mcp_server.py")
+# One MCP session (and server process) for the whole chat, instead of one per tool call
+mcp_session = McpSession("4_mcp_server.py")
 gemini_client = genai.Client()
 
 async def create_gemini_agent():
     """
     Creates and returns a Gemini chat agent with access to MCP tools.
-    
+
     Returns:
         chat (genai.aio.chats.Chat): The Gemini chat object configured with MCP tools.
     """
-    async with mcp_client:
-        # Save the existing prompts as samples
-        system_instruction = (
-            "You are an assistant with access to MCP tools. Use them to answer user queries. "
-            "The tools: " + str(await mcp_client.list_tools())
-        )
-        
-        chat = gemini_client.aio.chats.create(
-            model="gemini-2.0-flash",
-            config=genai.types.GenerateContentConfig(
-                temperature=0,
-                tools=[mcp_client.session],
-                system_instruction=system_instruction
-            ),
-        )
-        return chat
+    # The MCP session stays open until main() closes it
+    await mcp_session.connect()
+    tools_list = await mcp_session.list_tools()
+    # The full tool schemas reach Gemini through tools=gemini_tools(...) below, so the system
+    # instruction only carries a compact one-line-per-tool summary
+    system_instruction = (
+        "You are an assistant with access to MCP tools. Use them to answer user queries. "
+        "The tools:\n" + tool_summary(tools_list)
+    )
+    if MCP_REPORT_TOOL_TOKENS:
+        await report_tool_summary_tokens(gemini_client, "gemini-2.0-flash", tools_list)
+
+    chat = gemini_client.aio.chats.create(
+        model="gemini-2.0-flash",
+        config=genai.types.GenerateContentConfig(
+            temperature=0,
+            # Built once from the cached tool list (see gemini_tools)
+            tools=gemini_tools(tools_list),
+            # Tool calls are run by send_message_async, all calls of a turn in parallel
+            automatic_function_calling=NO_AUTOMATIC_FUNCTION_CALLING,
+            system_instruction=system_instruction
+        ),
+    )
+    return chat
 
 async def main():
     """
     Main function to interact with the Gemini agent in a loop.
     """
-    chat = await create_gemini_agent()
-    print("Gemini agent is ready. Type 'exit' to quit.")
-    
-    while True:
-        user_input = input("You: ")
-        if user_input.lower() == "exit":
-            print("Exiting the chat. Goodbye!")
-            break
+    async with mcp_session:
+        chat = await create_gemini_agent()
+        print("Gemini agent is ready. Type 'exit' to quit.")
         
-        response = await chat.send_message(user_input)
-        print("Gemini: ", response.text)
+        while True:
+            user_input = input("You: ")
+            if user_input.lower() == "exit":
+                print("Exiting the chat. Goodbye!")
+                break
+            
+            # If the MCP server went away, the session reconnects on the next tool call
+            response = await send_message_async(chat, user_input, mcp_session)
+            print("Gemini: ", response.text)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,154 +1,94 @@
 import os
-import urllib.request
-import urllib.parse
 from fastmcp import FastMCP
-import xml.etree.ElementTree as ET
-import re
-mcp = FastMCP("Arxiv Mcp Server")
-@mcp.tool
-def fetch_arxiv_papers(topic: str, number_of_papers: int = 3) -> dict:
+from arxiv_core.middleware import LoggingMiddleware, MetricsMiddleware, SessionMetricsMiddleware, TracingMiddleware, metrics_endpoint
+from arxiv_core.tools import TOOLS, TOOLS_VERSION
+from arxiv_core.tracing import setup_tracing
+mcp = FastMCP("Arxiv Mcp Server", version=TOOLS_VERSION)
+
+# The tools are implemented once in arxiv_core/tools.py and shared with 4_mcp_server.py.
+# TOOLS_VERSION is a hash of their definitions, so clients drop their cached tool list when a tool changes.
+for tool in TOOLS:
+    mcp.tool(tool)
+
+# Count and time every tool call for the /metrics endpoint
+mcp.add_middleware(MetricsMiddleware())
+# Run every tool call in a span that continues the client's trace
+mcp.add_middleware(TracingMiddleware())
+# Log every tool call to stderr or ARXIV_LOG_FILE (see arxiv_core.log)
+mcp.add_middleware(LoggingMiddleware())
+
+def env_flag(name: str) -> bool:
     """
-    Retrieves the latest papers from arXiv matching a given topic.
-    
-    Args:
-        topic (str): The search topic or keyword (e.g., "mcp", "machine learning").
-        number_of_papers (int, optional): The number of latest papers to retrieve. Defaults to 3.
-    
-    Returns:
-        dict: A structured response with the following keys:
-            - 'status' (str): 'success' or 'error'.
-            - 'data' (list): A list of dictionaries, each representing a paper with keys:
-                - 'arxiv_id' (str): The arXiv identifier of the paper.
-                - 'title' (str): The title of the paper.
-                - 'authors' (list of str): List of author names.
-                - 'published' (str): Publication date in ISO format.
-                - 'pdf_link' (str): URL to the PDF of the paper.
-            - 'message' (str): A message describing the result or error.
+    Returns True if the environment variable is set to 1, true or yes.
     """
-    try:
-        if not topic or not isinstance(topic, str):
-            return {"status": "error", "data": [], "message": "Invalid topic provided."}
-        if not isinstance(number_of_papers, int) or number_of_papers <= 0:
-            return {"status": "error", "data": [], "message": "Invalid number_of_papers provided."}
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
 
-        search_query = f"all:{urllib.parse.quote(topic)}"
-        url = f'http://export.arxiv.org/api/query?search_query={search_query}&start=0&max_results={number_of_papers}&sortBy=submittedDate&sortOrder=descending'
-        
-        print(f"******* FUNCTION CALLED: Fetching papers from arXiv with URL: {url} *******")
-    
-        with urllib.request.urlopen(url) as resp:
-            raw = resp.read()
-
-        root = ET.fromstring(raw)
-        papers = []
-        for entry in root.findall(".//{*}entry"):
-            full_id = entry.findtext("{*}id")
-            arxiv_id = full_id.split("/")[-1] if full_id else None
-            title = entry.findtext("{*}title")
-            published = entry.findtext("{*}published")
-            authors = [a.findtext("{*}name") for a in entry.findall("{*}author")]
-            pdf_link = next((l.get("href") for l in entry.findall("{*}link") if l.get("type") == "application/pdf"), None)
-            papers.append({
-                'arxiv_id': arxiv_id,
-                'title': title,
-                'authors': authors,
-                'published': published,
-                'pdf_link': pdf_link
-            })
-
-        return {"status": "success", "data": papers, "message": f"Fetched {len(papers)} papers successfully."}
-    except Exception as e:
-        return {"status": "error", "data": [], "message": f"An error occurred: {e}"}
-
-@mcp.tool
-def get_arxiv_abstract(arxiv_id: str) -> dict:
-    """
-    Fetches and returns the abstract of a specific arXiv paper.
-    
-    Args:
-        arxiv_id (str): The arXiv ID (e.g., "2301.12345"). Must be a valid arXiv identifier.
-    
-    Returns:
-        dict: A structured response with the following keys:
-            - 'status' (str): 'success' or 'error'.
-            - 'data' (str): The abstract text of the paper, or None if not found.
-            - 'message' (str): A message describing the result or error.
+def create_app():
     """
-    try:
-        if not arxiv_id or not isinstance(arxiv_id, str):
-            return {"status": "error", "data": None, "message": "Invalid arXiv ID provided."}
+    Creates the Streamable HTTP app for the MCP server.
 
-        url = f'http://export.arxiv.org/api/query?id_list={urllib.parse.quote(arxiv_id)}'
-        print(f"******* FUNCTION CALLED: Fetching paper abstract from arXiv with URL: {url} *******")
-        with urllib.request.urlopen(url) as resp:
-            raw = resp.read()
-
-        root = ET.fromstring(raw)
-        entry = root.find(".//{*}entry")
-        if entry is not None:
-            abstract = entry.findtext("{*}summary")
-            return {"status": "success", "data": abstract, "message": "Abstract fetched successfully."}
-        else:
-            return {"status": "error", "data": None, "message": "Paper not found."}
-    except Exception as e:
-        return {"status": "error", "data": None, "message": f"An error occurred: {e}"}
-
-@mcp.tool
-def save_md_to_file(text: str, filename: str) -> dict:
+    In stateless mode (MCP_STATELESS_HTTP) every request is self-contained: no session is negotiated or kept
+    in memory, so replicas behind a load balancer need no sticky sessions. More than one worker (MCP_WORKERS)
+    always implies stateless mode, since uvicorn workers share one listening socket and cannot route a session
+    to the worker that created it. Progress and partial results are still streamed back on each tool call's own
+    response, unless MCP_JSON_RESPONSE makes the server answer with a single plain JSON response instead of SSE.
     """
-    Saves the given Markdown-formatted text to a .md file in the ./reports folder.
-    
-    Args:
-        text (str): The Markdown-formatted text to save.
-        filename (str): The desired name of the file (e.g., "Model Context Protocols in Adaptive Transport Systems").
-            Special characters will be replaced with hyphens, and '.md' will be appended if not present.
-    
-    Returns:
-        dict: A structured response with the following keys:
-            - 'status' (str): 'success' or 'error'.
-            - 'data' (str): The path to the saved file, or None if an error occurred.
-            - 'message' (str): A message describing the result or error.
-    """
-    try:
-        if not text or not isinstance(text, str):
-            return {"status": "error", "data": None, "message": "Invalid text provided."}
-        if not filename or not isinstance(filename, str):
-            return {"status": "error", "data": None, "message": "Invalid filename provided."}
-
-        # Create reports folder if it doesn't exist
-        os.makedirs("./reports", exist_ok=True)
-
-        # Sanitize filename to avoid issues with special characters
-        filename = re.sub(r'[<>:"/\\|?*]', '-', filename)
-        print(f"******* FUNCTION CALLED: Saving Markdown to file: {filename} *******")
-        if not filename.endswith('.md'):
-            filename += '.md'
-
-        # Set path to ./reports
-        filepath = os.path.join("./reports", filename)
-
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(text)
-
-        return {"status": "success", "data": filepath, "message": "File saved successfully."}
-    except Exception as e:
-        return {"status": "error", "data": None, "message": f"An error occurred: {e}"}
+    from fastmcp.server.http import create_streamable_http_app
+    from starlette.middleware import Middleware
+    from starlette.routing import Route
+
+    # Every worker exports its own spans (see arxiv_core.tracing)
+    setup_tracing("arxiv-mcp-server")
+    workers = int(os.environ.get("MCP_WORKERS", "1"))
+    return create_streamable_http_app(
+        mcp,
+        streamable_http_path="/",
+        stateless_http=env_flag("MCP_STATELESS_HTTP") or workers > 1,
+        json_response=env_flag("MCP_JSON_RESPONSE"),
+        # Prometheus metrics are served next to the MCP endpoint
+        routes=[Route("/metrics", metrics_endpoint)],
+        middleware=[Middleware(SessionMetricsMiddleware)],
+    )
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    from fastmcp.server.http import create_streamable_http_app
-
-    # Create StreamableHTTP app for the MCP server
-    app = create_streamable_http_app(mcp, streamable_http_path="/")
 
-    # Run the server on port 1923
-    uvicorn.run(app, host="0.0.0.0", port=1923)
+    parser = argparse.ArgumentParser(description="Arxiv MCP server with Streamable HTTP transport")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MCP_WORKERS", "1")),
+                        help="Number of worker processes (default: MCP_WORKERS or 1)")
+    parser.add_argument("--stateless", action="store_true", default=env_flag("MCP_STATELESS_HTTP"),
+                        help="Keep no session state between requests (default: MCP_STATELESS_HTTP)")
+    parser.add_argument("--json-response", action="store_true", default=env_flag("MCP_JSON_RESPONSE"),
+                        help="Answer with plain JSON instead of SSE streams (default: MCP_JSON_RESPONSE)")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", "1923")),
+                        help="Port to listen on (default: MCP_PORT or 1923)")
+    args = parser.parse_args()
+    # Worker processes read the settings from the environment when they create the app
+    os.environ["MCP_WORKERS"] = str(args.workers)
+    os.environ["MCP_STATELESS_HTTP"] = "1" if args.stateless else ""
+    os.environ["MCP_JSON_RESPONSE"] = "1" if args.json_response else ""
+    if args.workers > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Workers write their metrics to a shared folder, so /metrics can add them up
+        import tempfile
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="mcp_metrics_")
+
+    # Run the server on port 1923 unless --port or MCP_PORT says otherwise
+    if args.workers > 1:
+        # Each worker imports this module and builds its own app with create_app
+        uvicorn.run("8_mcp_docker_server:create_app", factory=True, host="0.0.0.0", port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(create_app(), host="0.0.0.0", port=args.port)
 
 # USE COMMANDS:
 # For Docker deployment (recommended):
 # 1. Build: docker build -t mcp-server .
 # 2. Run: docker run -d -p 1923:1923 -v ${PWD}/reports:/app/reports mcp-server
+#    Multi-worker: docker run -d -p 1923:1923 -e MCP_WORKERS=4 -v ${PWD}/reports:/app/reports mcp-server
+#    Stateless replicas behind a load balancer: add -e MCP_STATELESS_HTTP=1 (and -e MCP_JSON_RESPONSE=1 for plain JSON responses)
 # 3. Test: npx @modelcontextprotocol/inspector --transport streamable-http --url http://localhost:1923
+# 4. Metrics: curl http://localhost:1923/metrics
+# 5. Tracing: add -e OTEL_EXPORTER_OTLP_ENDPOINT=http://host.docker.internal:4318 (or -e ARXIV_TRACES_FILE=/app/reports/traces.jsonl)
 #
 # For local development (stdio transport):
 # "fastmcp run 4_mcp_server.py:mcp" - runs server with stdio transport for local testing
@@ -157,5 +97,5 @@ if __name__ == "__main__":
 # ARCHITECTURE:
 # - Docker container runs MCP server with HTTP transport on port 1923
 # - Gemini agent runs locally and connects to Dockerized MCP server
-# - Tools available: fetch_arxiv_papers, get_arxiv_abstract, save_md_to_file
+# - Tools available: fetch_arxiv_papers, get_arxiv_abstract, get_arxiv_abstracts, save_md_to_file
 # - Reports are saved to ./reports directory (mounted from host)
@@ -1,13 +1,31 @@
-from fastmcp import Client
+from arxiv_core.agent import NO_AUTOMATIC_FUNCTION_CALLING, gemini_tools, report_tool_summary_tokens, send_message_async, tool_summary
+from arxiv_core.config import MCP_REPORT_TOOL_TOKENS, PARTIAL_RESULTS_LOGGER
+from arxiv_core.session import McpSession
+from arxiv_core.tracing import setup_tracing
+from fastmcp.client.logging import LogMessage, default_log_handler
 from fastmcp.client.transports import StreamableHttpTransport
 from google import genai
 import asyncio
 
+async def log_handler(message: LogMessage):
+    """
+    Shows the papers of a long fetch as the server streams them, while Gemini is still waiting for the tool result.
+    """
+    if message.logger == PARTIAL_RESULTS_LOGGER:
+        print(f"[MCP] {message.data['msg']}")
+        for paper in message.data["extra"]["papers"]:
+            print(f"  - {paper['arxiv_id']}: {paper['title']}")
+    else:
+        await default_log_handler(message)
+
+# Trace every message from Gemini down to the arXiv API if ARXIV_TRACES_FILE or OTEL_EXPORTER_OTLP_ENDPOINT is set
+setup_tracing("arxiv-gemini-agent")
 
 # Connect to the MCP server running in Docker on localhost:1923
 # For HTTP transport, we need to create a StreamableHttpTransport
 transport = StreamableHttpTransport("http://localhost:1923")
-mcp_client = Client(transport)
+# One MCP session for the whole chat; it reconnects if the server restarts
+mcp_session = McpSession(transport, log_handler=log_handler)
 gemini_client = genai.Client()
 
 async def create_gemini_agent():
@@ -18,21 +36,27 @@ async def create_gemini_agent():
         chat (genai.aio.chats.Chat): The Gemini chat object configured with MCP tools.
     """
     try:
-        # Note: MCP client context is now managed in main() function
-        # Save the existing prompts as samples
-        tools_list = await mcp_client.list_tools()
+        # Note: MCP session is opened in main() function and stays open for the whole chat
+        await mcp_session.connect()
+        tools_list = await mcp_session.list_tools()
 
-        
+        # The full tool schemas reach Gemini through tools=gemini_tools(...) below, so the system
+        # instruction only carries a compact one-line-per-tool summary
         system_instruction = (
             "You are an assistant with access to MCP tools. Use them to answer user queries. "
-            f"The tools: {tools_list}"
+            f"The tools:\n{tool_summary(tools_list)}"
         )
+        if MCP_REPORT_TOOL_TOKENS:
+            await report_tool_summary_tokens(gemini_client, "gemini-2.0-flash", tools_list)
         
         chat = gemini_client.aio.chats.create(
             model="gemini-2.0-flash",
             config=genai.types.GenerateContentConfig(
                 temperature=0,
-                tools=[mcp_client.session],
+                # Built once from the cached tool list (see gemini_tools)
+                tools=gemini_tools(tools_list),
+                # Tool calls are run by send_message_async, all calls of a turn in parallel
+                automatic_function_calling=NO_AUTOMATIC_FUNCTION_CALLING,
                 system_instruction=system_instruction
             ),
         )
@@ -47,7 +71,7 @@ async def main():
     """
     try:
         # Keep MCP client session open for the entire duration
-        async with mcp_client:
+        async with mcp_session:
 
             chat = await create_gemini_agent()
             print("Gemini agent is ready. Type 'exit' to quit.")
@@ -59,7 +83,8 @@ async def main():
                     break
                 
                 try:
-                    response = await chat.send_message(user_input)
+                    # If the MCP server restarted, the session reconnects on the next tool call
+                    response = await send_message_async(chat, user_input, mcp_session)
                     print("Gemini: ", response.text)
                 except Exception as e:
                     print(f"Sorry, I encountered an error processing your message: {e}")
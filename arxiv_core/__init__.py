@@ -0,0 +1,25 @@
+"""
+Shared arXiv library used by every script and MCP server in this tutorial.
+
+- `arxiv_core.api`: async, cached and coalesced access to the arXiv API.
+- `arxiv_core.sync`: blocking wrappers for scripts without an event loop.
+- `arxiv_core.tools`: the MCP tools registered by 4_mcp_server.py and 8_mcp_docker_server.py.
+- `arxiv_core.session`: a long-lived, reconnecting MCP client session for the clients and agents.
+- `arxiv_core.agent`: Gemini agent loops that run all function calls of a model turn in parallel.
+- `arxiv_core.parser`, `arxiv_core.cache`, `arxiv_core.fetch`: streaming parser, on-disk cache and HTTP layer.
+"""
+
+from arxiv_core.api import get_abstract, get_abstracts, get_cache, get_papers
+from arxiv_core.cache import ArxivCache
+from arxiv_core.files import save_markdown
+from arxiv_core.parser import Paper
+
+__all__ = [
+    "ArxivCache",
+    "Paper",
+    "get_abstract",
+    "get_abstracts",
+    "get_cache",
+    "get_papers",
+    "save_markdown",
+]
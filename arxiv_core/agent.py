@@ -0,0 +1,191 @@
+from concurrent.futures import ThreadPoolExecutor
+from google.genai import types
+from arxiv_core.config import MCP_MAX_CONCURRENT_CALLS
+from arxiv_core.tracing import tracer
+
+# Gemini agent loops that run all function calls of a model turn in parallel.
+# Automatic function calling runs the calls of a turn one after another, e.g. three
+# get_arxiv_abstract calls take three round trips to arXiv. These loops are used with
+# automatic function calling disabled (see NO_AUTOMATIC_FUNCTION_CALLING): they run the calls
+# of a turn concurrently and send all the responses back to the model in one follow-up message.
+# gemini_tools converts the MCP tools to Gemini function declarations, and tool_summary renders
+# the compact tool list the MCP agents put in their system instruction.
+# send_message_async traces each message, with a span per Gemini call and per tool call (see arxiv_core.tracing).
+
+NO_AUTOMATIC_FUNCTION_CALLING = types.AutomaticFunctionCallingConfig(disable=True)
+
+# Same limit as the automatic function calling of google-genai
+MAX_TOOL_TURNS = 10
+
+def function_response(call: types.FunctionCall, result=None, error: Exception | None = None) -> types.Part:
+    """
+    Wraps the result (or error) of a function call in the response part Gemini expects.
+    """
+    response = {"error": str(error)} if error is not None else {"result": result}
+    return types.Part.from_function_response(name=call.name, response=response)
+
+def run_function_calls(function_calls: list, functions: dict, max_workers: int = MCP_MAX_CONCURRENT_CALLS) -> list:
+    """
+    Runs the function calls of a model turn in a thread pool, and returns their response parts in call order.
+
+    Args:
+        function_calls (list of types.FunctionCall): The function calls of the model turn.
+        functions (dict): Maps each tool name to its Python function.
+        max_workers (int, optional): The maximum number of functions running at once.
+    """
+    def run(call: types.FunctionCall) -> types.Part:
+        try:
+            return function_response(call, functions[call.name](**(call.args or {})))
+        except Exception as e:
+            return function_response(call, error=e)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(function_calls))) as pool:
+        return list(pool.map(run, function_calls))
+
+def send_message(chat, message, functions: list, max_workers: int = MCP_MAX_CONCURRENT_CALLS):
+    """
+    Sends a message to a Gemini chat and answers the model's function calls until it replies without any.
+
+    The chat must be created with automatic function calling disabled. The function calls of each
+    model turn run in parallel in a thread pool (see run_function_calls).
+
+    Args:
+        chat (genai.chats.Chat): The Gemini chat.
+        message: The user message.
+        functions (list): The Python functions the chat was configured with.
+        max_workers (int, optional): The maximum number of functions running at once.
+
+    Returns:
+        types.GenerateContentResponse: The model's final response.
+    """
+    function_map = {function.__name__: function for function in functions}
+    response = chat.send_message(message)
+    for _ in range(MAX_TOOL_TURNS):
+        if not response.function_calls:
+            break
+        response = chat.send_message(run_function_calls(response.function_calls, function_map, max_workers))
+    return response
+
+async def run_mcp_function_calls(function_calls: list, mcp_session, max_concurrency: int = MCP_MAX_CONCURRENT_CALLS) -> list:
+    """
+    Runs the function calls of a model turn as concurrent MCP tool calls, and returns their response parts in call order.
+
+    Args:
+        function_calls (list of types.FunctionCall): The function calls of the model turn.
+        mcp_session (arxiv_core.session.McpSession): The session to call the tools over.
+        max_concurrency (int, optional): The maximum number of tool calls in flight at once.
+    """
+    results = await mcp_session.call_tools(
+        [(call.name, call.args or {}) for call in function_calls],
+        max_concurrency,
+        return_exceptions=True,
+    )
+    parts = []
+    for call, result in zip(function_calls, results):
+        if isinstance(result, Exception):
+            parts.append(function_response(call, error=result))
+        elif result.structured_content is not None:
+            parts.append(function_response(call, result.structured_content))
+        else:
+            parts.append(function_response(call, "\n".join(item.text for item in result.content if hasattr(item, "text"))))
+    return parts
+
+async def traced_send_message(chat, message, turn: int):
+    """
+    Sends one message to an async Gemini chat in a span that records the token usage and the function calls asked for.
+    """
+    with tracer.start_as_current_span("gemini.send_message", attributes={"agent.turn": turn}) as span:
+        response = await chat.send_message(message)
+        usage = response.usage_metadata
+        if usage is not None:
+            span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_token_count or 0)
+            span.set_attribute("gen_ai.usage.output_tokens", usage.candidates_token_count or 0)
+        span.set_attribute("agent.function_calls", len(response.function_calls or []))
+        return response
+
+async def send_message_async(chat, message, mcp_session, max_concurrency: int = MCP_MAX_CONCURRENT_CALLS):
+    """
+    Async version of send_message for chats whose tools are MCP tools.
+
+    The chat must be created with automatic function calling disabled. The function calls of each
+    model turn run as concurrent tool calls over `mcp_session` (see run_mcp_function_calls).
+
+    Returns:
+        types.GenerateContentResponse: The model's final response.
+    """
+    with tracer.start_as_current_span("agent.send_message"):
+        response = await traced_send_message(chat, message, 0)
+        for turn in range(1, MAX_TOOL_TURNS + 1):
+            if not response.function_calls:
+                break
+            with tracer.start_as_current_span("agent.function_calls", attributes={"agent.turn": turn, "agent.function_calls": len(response.function_calls)}):
+                parts = await run_mcp_function_calls(response.function_calls, mcp_session, max_concurrency)
+            response = await traced_send_message(chat, parts, turn)
+        return response
+
+def _gemini_schema(schema: dict) -> dict:
+    """
+    Keeps the parts of a JSON schema that types.JSONSchema supports, in nested properties, items and anyOf too.
+    """
+    supported = set(types.JSONSchema.model_fields) | {field.alias for field in types.JSONSchema.model_fields.values() if field.alias}
+    kept = {}
+    for key, value in schema.items():
+        if key not in supported:
+            continue
+        if key == "properties":
+            value = {name: _gemini_schema(property_schema) for name, property_schema in value.items()}
+        elif key == "items":
+            value = _gemini_schema(value)
+        elif key in ("anyOf", "any_of"):
+            value = [_gemini_schema(option) for option in value]
+        kept[key] = value
+    return kept
+
+def gemini_tools(tools: list) -> list:
+    """
+    Converts MCP tools to the Gemini tools of a chat config, as one types.Tool with a function declaration per tool.
+
+    Passing the MCP session itself as a tool makes google-genai send tools/list before every Gemini call.
+    The declarations built here from McpSession.list_tools are reused for the whole chat instead.
+    """
+    return [types.Tool(function_declarations=[
+        types.FunctionDeclaration(
+            name=tool.name,
+            description=tool.description,
+            parameters=types.Schema.from_json_schema(json_schema=types.JSONSchema(**_gemini_schema(tool.inputSchema))),
+        )
+        for tool in tools
+    ])]
+
+def tool_summary(tools: list) -> str:
+    """
+    Renders MCP tools as a compact, deterministic list for a system instruction.
+
+    Each tool becomes one line with its name, its parameters (optional ones marked with '?')
+    and the first line of its description. The full schemas already reach the model through
+    the chat's tools, so they are not repeated here. Tools are sorted by name, so the same
+    tools always give the same text.
+    """
+    lines = []
+    for tool in sorted(tools, key=lambda tool: tool.name):
+        properties = tool.inputSchema.get("properties", {})
+        required = set(tool.inputSchema.get("required", []))
+        params = ", ".join(name if name in required else f"{name}?" for name in properties)
+        description = (tool.description or "").strip().split("\n")[0]
+        lines.append(f"- {tool.name}({params}): {description}")
+    return "\n".join(lines)
+
+async def report_tool_summary_tokens(gemini_client, model: str, tools: list):
+    """
+    Prints how many input tokens the compact tool summary takes, compared to str(tools).
+
+    Uses the Gemini count_tokens API; a failure is printed instead of raised.
+    """
+    try:
+        compact = await gemini_client.aio.models.count_tokens(model=model, contents=tool_summary(tools))
+        full = await gemini_client.aio.models.count_tokens(model=model, contents=str(tools))
+        saved = full.total_tokens - compact.total_tokens
+        print(f"Tool summary: {compact.total_tokens} tokens instead of {full.total_tokens} for str(list_tools()) "
+              f"({saved} tokens saved on every turn)")
+    except Exception as e:
+        print(f"Could not count tool summary tokens: {e}")
@@ -0,0 +1,290 @@
+import asyncio
+import collections
+import logging
+import urllib.parse
+import httpx
+from arxiv_core.cache import ArxivCache
+from arxiv_core.config import (
+    ARXIV_API_URL,
+    ARXIV_CACHE_MAX_BYTES,
+    ARXIV_CACHE_PATH,
+    ARXIV_CACHE_REVALIDATE_FOR,
+    ARXIV_MAX_PARALLEL_PAGES,
+    ARXIV_MAX_RESULTS,
+    ARXIV_PAGE_SIZE,
+    ARXIV_REQUEST_BURST,
+    ARXIV_REQUEST_DELAY,
+    MAX_IDS_PER_REQUEST,
+    MCP_WORKERS,
+    PARTIAL_RESULTS_BATCH,
+)
+from arxiv_core.fetch import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    SingleFlight,
+    UpstreamScheduler,
+    conditional_headers,
+    response_validators,
+    stream_url,
+)
+from arxiv_core.log import get_logger, log_event
+from arxiv_core.parser import abstract_from_entry, aiter_entries, iter_entries, match_abstracts
+from arxiv_core.tracing import tracer
+
+log = get_logger("api")
+
+# Shared by all callers in the process, so identical in-flight arXiv requests hit the upstream only once
+single_flight = SingleFlight()
+
+# Shared by all callers, so every arXiv request of the server counts against one rate limit
+upstream_scheduler = UpstreamScheduler(
+    1 / (ARXIV_REQUEST_DELAY * MCP_WORKERS) if ARXIV_REQUEST_DELAY > 0 else float("inf"),
+    ARXIV_REQUEST_BURST,
+)
+
+_cache = None
+
+def get_cache() -> ArxivCache:
+    """
+    Returns the shared on-disk cache for arXiv results, opening it on first use.
+
+    Its methods block on SQLite, so the async functions below call them through asyncio.to_thread.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ArxivCache(ARXIV_CACHE_PATH, max_bytes=ARXIV_CACHE_MAX_BYTES, stale_ttl=ARXIV_CACHE_REVALIDATE_FOR)
+    return _cache
+
+def search_url(topic: str, start: int, max_results: int) -> str:
+    """
+    Returns the arXiv API URL of one page of the latest papers for a topic, newest first.
+    """
+    search_query = f"all:{urllib.parse.quote(topic)}"
+    return f'{ARXIV_API_URL}?search_query={search_query}&start={start}&max_results={max_results}&sortBy=submittedDate&sortOrder=descending'
+
+async def iter_page(topic: str, start: int, max_results: int, priority: int = PRIORITY_NORMAL):
+    """
+    Fetches one page of the latest papers for a topic from arXiv, and yields each Paper as soon as it is parsed.
+    """
+    url = search_url(topic, start, max_results)
+
+    # Papers are parsed as the response streams in, one entry at a time
+    async for paper in aiter_entries(stream_url(url, upstream_scheduler, priority)):
+        yield paper
+
+async def iter_paginated_papers(topic: str, number_of_papers: int, failed_pages: list):
+    """
+    Fetches a large search page by page and yields the merged, de-duplicated papers.
+
+    Up to ARXIV_MAX_PARALLEL_PAGES pages are fetched concurrently, but papers are yielded in page order
+    as soon as every earlier page is done. A page that comes back shorter than requested means the
+    results ran out, so no further pages are requested and the ones already in flight are cancelled.
+    Papers already yielded by an earlier page are skipped, since new submissions can shift results
+    across page boundaries while a sweep is running.
+    A failed page does not abort the sweep; its start offset and error are appended to `failed_pages`.
+    """
+    def page_size(start: int) -> int:
+        return min(ARXIV_PAGE_SIZE, number_of_papers - start)
+
+    async def fetch(start: int) -> list:
+        # Sweep pages yield to interactive lookups in the upstream scheduler's queue
+        return [paper async for paper in iter_page(topic, start, page_size(start), PRIORITY_BULK)]
+
+    starts = iter(range(0, number_of_papers, ARXIV_PAGE_SIZE))
+    pending = collections.deque()
+
+    def schedule():
+        # Pages are started only as earlier ones finish, so a short page stops the sweep early
+        while len(pending) < ARXIV_MAX_PARALLEL_PAGES:
+            start = next(starts, None)
+            if start is None:
+                return
+            pending.append((start, asyncio.ensure_future(fetch(start))))
+
+    seen = set()
+    try:
+        schedule()
+        while pending:
+            start, task = pending.popleft()
+            try:
+                page = await task
+            except Exception as e:
+                failed_pages.append((start, e))
+                schedule()
+                continue
+            last_page = len(page) < page_size(start)
+            if not last_page:
+                schedule()
+            for paper in page:
+                if paper.arxiv_id not in seen:
+                    seen.add(paper.arxiv_id)
+                    yield paper
+            if last_page:
+                break
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+async def search_papers(topic: str, number_of_papers: int, on_papers=None) -> tuple:
+    """
+    Fetches and parses the latest papers for a topic from arXiv, and caches the result.
+
+    Searches larger than ARXIV_PAGE_SIZE are fetched in pages (see iter_paginated_papers).
+    If `on_papers` is given, it is awaited as `on_papers(batch, count)` with every
+    PARTIAL_RESULTS_BATCH newly parsed Paper objects and with the final, shorter batch.
+
+    Results are cached with empty validators, so they can be revalidated once they expire (see revalidate_papers).
+
+    Returns:
+        tuple: The papers as dictionaries, ready to be returned from a tool, and a list of
+            (start, error) pairs for the pages that failed. Results with failed pages are not cached.
+    """
+    failed_pages = []
+    if number_of_papers <= ARXIV_PAGE_SIZE:
+        paper_iter = iter_page(topic, 0, number_of_papers)
+    else:
+        paper_iter = iter_paginated_papers(topic, number_of_papers, failed_pages)
+
+    papers = []
+    batch = []
+    async for paper in paper_iter:
+        papers.append(paper)
+        if on_papers is not None:
+            batch.append(paper)
+            if len(batch) == PARTIAL_RESULTS_BATCH:
+                await on_papers(batch, len(papers))
+                batch = []
+    if on_papers is not None and batch:
+        await on_papers(batch, len(papers))
+
+    if failed_pages and not papers:
+        raise failed_pages[0][1]
+
+    data = [paper.to_dict() for paper in papers]
+    if not failed_pages:
+        await asyncio.to_thread(get_cache().set, "search", {"topic": topic, "number_of_papers": number_of_papers}, data, validators={})
+    return data, failed_pages
+
+async def revalidate_papers(topic: str, number_of_papers: int, on_papers=None) -> tuple:
+    """
+    Revalidates an expired search result with a probe for the newest paper on the topic, and returns the cached
+    papers if nothing was submitted since they were fetched. Otherwise fetches them again with search_papers.
+
+    The probe is a one-entry search sent as a conditional GET with the validators of the previous probe, so a
+    server that supports them answers 304 Not Modified with an empty body. arXiv does not always send an ETag
+    or Last-Modified header; then the probe's single entry is compared with the newest cached paper instead.
+    Either way, the probe costs one small request rather than a full download and parse of every page.
+    """
+    params = {"topic": topic, "number_of_papers": number_of_papers}
+    stale = await asyncio.to_thread(get_cache().get_stale, "search", params)
+    if stale is None:
+        return await search_papers(topic, number_of_papers, on_papers)
+    papers, validators = stale
+
+    responses = []
+    try:
+        body = b"".join([chunk async for chunk in stream_url(
+            search_url(topic, 0, 1), upstream_scheduler, PRIORITY_NORMAL, conditional_headers(validators), responses.append
+        )])
+    except httpx.HTTPError as e:
+        log_event(log, logging.WARNING, "revalidation_failed", topic=topic, error=repr(e))
+        return await search_papers(topic, number_of_papers, on_papers)
+
+    resp = responses[-1]
+    if resp.status_code == 304:
+        unchanged = True
+    else:
+        newest = list(iter_entries([body]))
+        unchanged = [paper.arxiv_id for paper in newest[:1]] == [paper["arxiv_id"] for paper in papers[:1]]
+    log_event(log, logging.INFO, "revalidated", topic=topic, status=resp.status_code, unchanged=unchanged)
+    if not unchanged:
+        return await search_papers(topic, number_of_papers, on_papers)
+
+    await asyncio.to_thread(get_cache().refresh, "search", params, response_validators(resp) or validators)
+    return papers, []
+
+async def get_papers(topic: str, number_of_papers: int, on_papers=None) -> tuple:
+    """
+    Returns the latest papers for a topic from the cache, or fetches them with search_papers.
+
+    Concurrent identical searches share one fetch. Only the caller that starts the fetch
+    receives partial results through `on_papers`; the others receive only the final result.
+    Expired results are revalidated before they are fetched again (see revalidate_papers).
+    Requests for more than ARXIV_MAX_RESULTS papers are clamped to it.
+    """
+    number_of_papers = min(number_of_papers, ARXIV_MAX_RESULTS)
+    params = {"topic": topic, "number_of_papers": number_of_papers}
+    with tracer.start_as_current_span("arxiv.get_papers", attributes={"arxiv.topic": topic, "arxiv.number_of_papers": number_of_papers}) as span:
+        papers = await asyncio.to_thread(get_cache().get, "search", params)
+        span.set_attribute("arxiv.cache_hit", papers is not None)
+        if papers is not None:
+            return papers, []
+        return await single_flight.do(
+            get_cache().make_key("search", params),
+            lambda: revalidate_papers(topic, number_of_papers, on_papers),
+        )
+
+async def fetch_abstract(arxiv_id: str) -> str | None:
+    """
+    Fetches the abstract of a single arXiv paper, and caches it. Returns None if the paper is not found.
+    """
+    url = f'{ARXIV_API_URL}?id_list={urllib.parse.quote(arxiv_id)}'
+    entries = [entry async for entry in aiter_entries(stream_url(url, upstream_scheduler, PRIORITY_INTERACTIVE), abstract_from_entry)]
+    if not entries:
+        return None
+    abstract = entries[0][1]
+    if abstract is not None:
+        await asyncio.to_thread(get_cache().set, "abstract", {"arxiv_id": arxiv_id}, abstract)
+    return abstract
+
+async def get_abstract(arxiv_id: str) -> str | None:
+    """
+    Returns the abstract of a single arXiv paper from the cache, or fetches it. Returns None if the paper is not found.
+    """
+    with tracer.start_as_current_span("arxiv.get_abstract", attributes={"arxiv.id": arxiv_id}) as span:
+        abstract = await asyncio.to_thread(get_cache().get, "abstract", {"arxiv_id": arxiv_id})
+        span.set_attribute("arxiv.cache_hit", abstract is not None)
+        if abstract is not None:
+            return abstract
+        return await single_flight.do(
+            get_cache().make_key("abstract", {"arxiv_id": arxiv_id}),
+            lambda: fetch_abstract(arxiv_id),
+        )
+
+async def fetch_abstracts(batch: list[str]) -> dict:
+    """
+    Fetches the abstracts of a batch of arXiv papers with one id_list request, and caches them.
+    """
+    id_list = ",".join(urllib.parse.quote(arxiv_id) for arxiv_id in batch)
+    url = f'{ARXIV_API_URL}?id_list={id_list}&max_results={len(batch)}'
+    fetched = match_abstracts([entry async for entry in aiter_entries(stream_url(url, upstream_scheduler), abstract_from_entry)], batch)
+    # One transaction for the whole batch, off the event loop
+    await asyncio.to_thread(get_cache().set_many, "abstract", [
+        ({"arxiv_id": arxiv_id}, abstract) for arxiv_id, abstract in fetched.items() if abstract is not None
+    ])
+    return fetched
+
+async def get_abstracts(arxiv_ids: list[str]) -> dict:
+    """
+    Returns the abstracts of several arXiv papers, keyed by ID in the caller's order.
+
+    Cached abstracts are served from the cache; the rest are fetched in batches of up to
+    MAX_IDS_PER_REQUEST IDs per request. IDs with no matching paper are mapped to None.
+    """
+    # Remove duplicates but keep the caller's order
+    arxiv_ids = list(dict.fromkeys(arxiv_ids))
+    with tracer.start_as_current_span("arxiv.get_abstracts", attributes={"arxiv.ids": len(arxiv_ids)}) as span:
+        cached = await asyncio.to_thread(get_cache().get_many, "abstract", [{"arxiv_id": arxiv_id} for arxiv_id in arxiv_ids])
+        abstracts = dict(zip(arxiv_ids, cached))
+        # Only the abstracts that are not cached yet are fetched from arXiv
+        missing = [arxiv_id for arxiv_id, abstract in abstracts.items() if abstract is None]
+        span.set_attribute("arxiv.cache_hits", len(arxiv_ids) - len(missing))
+        for i in range(0, len(missing), MAX_IDS_PER_REQUEST):
+            batch = missing[i:i + MAX_IDS_PER_REQUEST]
+            fetched = await single_flight.do(
+                get_cache().make_key("abstracts", {"arxiv_ids": batch}),
+                lambda: fetch_abstracts(batch),
+            )
+            abstracts.update(fetched)
+        return abstracts
@@ -0,0 +1,258 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from arxiv_core.metrics import CACHE_LOOKUPS
+
+# Default time-to-live (in seconds) per arXiv endpoint.
+# Abstracts looked up by ID never change, so they are kept until evicted.
+# Search results change as new papers are submitted, so they expire quickly.
+# MCP tool lists are keyed by a hash of the tool definitions; the TTL is a backstop for servers that do not hash them.
+DEFAULT_TTLS = {
+    "search": 15 * 60,
+    "abstract": None,
+    "tools": 24 * 60 * 60,
+}
+
+# Expired entries are swept, and the running size total is recounted, once every this many writes
+SWEEP_EVERY = 100
+# A hit only rewrites last_access if the stored one is older than this many seconds, so most hits are read-only
+LAST_ACCESS_RESOLUTION = 60
+# Least recently used entries are evicted this many at a time
+EVICT_BATCH = 64
+
+class ArxivCache:
+    """
+    Persistent on-disk cache for arXiv API results, stored in a local SQLite database.
+
+    Entries are keyed on the endpoint name and its normalized query parameters, so
+    "MCP" and " mcp " share one entry. Each endpoint has its own TTL, the total size of
+    the stored values is capped, and the least recently used entries are evicted first.
+    Hit and miss counters are kept per endpoint.
+
+    Writes are cheap: the total size is kept as a running count instead of summed on every write,
+    expired entries are swept only every SWEEP_EVERY writes, and set_many stores a whole batch in
+    one transaction. The methods block on disk I/O, so async code should call them through
+    asyncio.to_thread. Several processes may share one database; each recounts the total size
+    when it sweeps, so writes by the others are taken into account within SWEEP_EVERY writes.
+
+    Entries stored with validators (e.g. the ETag and Last-Modified of the arXiv response) are kept for
+    `stale_ttl` seconds after they expire, so they can be revalidated with a conditional request and
+    refreshed instead of downloaded and parsed again (see get_stale and refresh).
+
+    Args:
+        path (str): Path of the SQLite database file. Parent folders are created if needed.
+        max_bytes (int, optional): Maximum total size of the cached values. Defaults to 50 MB.
+        ttls (dict, optional): Maps endpoint names to a TTL in seconds, or None to never expire.
+        stale_ttl (float, optional): How long expired entries with validators are kept. Defaults to one day.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, ttls: dict | None = None, stale_ttl: float = 24 * 60 * 60):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale_ttl = stale_ttl
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        # Databases created before validators were stored get the column added
+        if "validators" not in [row[1] for row in self._conn.execute("PRAGMA table_info(cache)")]:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN validators TEXT")
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        """
+        Builds a cache key from the endpoint name and normalized query parameters.
+
+        String values are stripped, lower-cased and have their inner whitespace collapsed.
+        """
+        normalized = {
+            name: " ".join(value.lower().split()) if isinstance(value, str) else value
+            for name, value in params.items()
+        }
+        return f"{endpoint}:{json.dumps(normalized, sort_keys=True)}"
+
+    def get(self, endpoint: str, params: dict):
+        """
+        Returns the cached value for the given query, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            return self._get(endpoint, params, time.time())
+
+    def get_many(self, endpoint: str, params_list: list) -> list:
+        """
+        Returns the cached values for several queries of one endpoint, in order, in one transaction.
+        Misses and expired entries are None.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                return [self._get(endpoint, params, now) for params in params_list]
+            finally:
+                self._conn.execute("COMMIT")
+
+    def _get(self, endpoint: str, params: dict, now: float):
+        key = self.make_key(endpoint, params)
+        row = self._conn.execute(
+            "SELECT value, expires_at, last_access, size FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            # Expired entries with validators are left for get_stale
+            if row is not None:
+                if self._conn.execute("DELETE FROM cache WHERE key = ? AND validators IS NULL", (key,)).rowcount:
+                    self._total -= row[3]
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+            CACHE_LOOKUPS.labels(endpoint, "miss").inc()
+            return None
+        if now - row[2] > LAST_ACCESS_RESOLUTION:
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+        self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+        CACHE_LOOKUPS.labels(endpoint, "hit").inc()
+        return json.loads(row[0])
+
+    def get_stale(self, endpoint: str, params: dict) -> tuple | None:
+        """
+        Returns the (value, validators) of a cached entry that was stored with validators, even if it expired
+        less than `stale_ttl` seconds ago. Returns None if there is no such entry.
+        """
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, validators FROM cache WHERE key = ? AND validators IS NOT NULL "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time() - self.stale_ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def set(self, endpoint: str, params: dict, value, validators: dict | None = None) -> None:
+        """
+        Stores a JSON-serializable value for the given query and evicts old entries if over the size cap.
+
+        If `validators` is given (it may be empty), the entry can be revalidated after it expires (see get_stale).
+        """
+        with self._lock:
+            self._put(endpoint, params, value, validators, time.time())
+            self._evict()
+
+    def set_many(self, endpoint: str, items: list) -> None:
+        """
+        Stores several (params, value) pairs of one endpoint in one transaction, then evicts old entries if over the size cap.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for params, value in items:
+                    self._put(endpoint, params, value, None, now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+                raise
+            self._conn.execute("COMMIT")
+            self._evict(len(items))
+
+    def _put(self, endpoint: str, params: dict, value, validators: dict | None, now: float) -> None:
+        key = self.make_key(endpoint, params)
+        data = json.dumps(value)
+        ttl = self.ttls.get(endpoint)
+        expires_at = now + ttl if ttl is not None else None
+        old = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, endpoint, value, size, expires_at, last_access, validators) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, endpoint, data, len(data), expires_at, now, json.dumps(validators) if validators is not None else None),
+        )
+        self._total += len(data) - (old[0] if old is not None else 0)
+
+    def refresh(self, endpoint: str, params: dict, validators: dict) -> None:
+        """
+        Marks a revalidated entry as fresh for another TTL, without rewriting its value, and stores its new validators.
+        """
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        ttl = self.ttls.get(endpoint)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE cache SET expires_at = ?, last_access = ?, validators = ? WHERE key = ?",
+                (now + ttl if ttl is not None else None, now, json.dumps(validators), key),
+            )
+        CACHE_LOOKUPS.labels(endpoint, "revalidated").inc()
+
+    def delete(self, endpoint: str, params: dict) -> None:
+        """
+        Removes the cached value for the given query, if any.
+        """
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._total -= row[0]
+
+    def _evict(self, writes: int = 1) -> None:
+        """
+        Every SWEEP_EVERY writes, removes expired entries and recounts the total size. Expired entries with
+        validators are only removed `stale_ttl` seconds after they expired. Then removes the least recently
+        used entries until the total size fits the cap.
+        """
+        previous, self._writes = self._writes, self._writes + writes
+        if previous // SWEEP_EVERY != self._writes // SWEEP_EVERY:
+            now = time.time()
+            self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND "
+                "(expires_at <= ? AND validators IS NULL OR expires_at <= ?)",
+                (now, now - self.stale_ttl),
+            )
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache ORDER BY last_access LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                self._total = 0
+                break
+            evicted = []
+            for key, size in rows:
+                evicted.append((key,))
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    break
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", evicted)
+            self._conn.execute("COMMIT")
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counters per endpoint together with the number and size of stored entries.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        return {"hits": dict(self.hits), "misses": dict(self.misses), "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,84 @@
+import os
+
+# arXiv API endpoint used by every tool.
+# Point it at bench/mock_arxiv_server.py to load-test the servers without calling the real API.
+ARXIV_API_URL = os.environ.get("ARXIV_API_URL", "http://export.arxiv.org/api/query")
+
+# Shared keep-alive connection pool for all arXiv requests.
+# Every call reuses pooled connections instead of opening a new socket,
+# and the limits cap how many concurrent connections we open to export.arxiv.org.
+ARXIV_MAX_CONNECTIONS = int(os.environ.get("ARXIV_MAX_CONNECTIONS", "10"))
+ARXIV_MAX_KEEPALIVE = int(os.environ.get("ARXIV_MAX_KEEPALIVE", "5"))
+ARXIV_TIMEOUT = float(os.environ.get("ARXIV_TIMEOUT", "30"))
+
+# Failed arXiv requests (connection errors, timeouts, 429 and 5xx responses) are retried up to ARXIV_MAX_RETRIES
+# times, as long as no part of the response was parsed yet. Retry n waits a random time of up to
+# ARXIV_RETRY_BASE_DELAY * 2**n seconds, capped at ARXIV_RETRY_MAX_DELAY ("full jitter" backoff).
+ARXIV_MAX_RETRIES = int(os.environ.get("ARXIV_MAX_RETRIES", "3"))
+ARXIV_RETRY_BASE_DELAY = float(os.environ.get("ARXIV_RETRY_BASE_DELAY", "0.5"))
+ARXIV_RETRY_MAX_DELAY = float(os.environ.get("ARXIV_RETRY_MAX_DELAY", "10"))
+
+# Hedged requests: if arXiv has not answered within the ARXIV_HEDGE_PERCENTILE-th percentile (e.g. 95) of the recent
+# times to first byte, the same request is sent once more and the first answer wins. A hedge is only sent if the rate
+# limiter has a token to spare, and only after ARXIV_HEDGE_MIN_SAMPLES responses were timed. 0 turns hedging off.
+ARXIV_HEDGE_PERCENTILE = float(os.environ.get("ARXIV_HEDGE_PERCENTILE", "0"))
+ARXIV_HEDGE_MIN_SAMPLES = 20
+# Never hedge sooner than this many seconds, so fast, slightly varying responses are not duplicated
+ARXIV_HEDGE_MIN_DELAY = float(os.environ.get("ARXIV_HEDGE_MIN_DELAY", "0.05"))
+
+# Persistent on-disk cache for arXiv responses
+ARXIV_CACHE_PATH = os.environ.get("ARXIV_CACHE_PATH", "./cache/arxiv_cache.sqlite3")
+ARXIV_CACHE_MAX_BYTES = int(os.environ.get("ARXIV_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+# Expired search results are kept this many seconds longer, to be revalidated with a cheap conditional
+# request instead of fetched and parsed again (see arxiv_core.api.revalidate_papers)
+ARXIV_CACHE_REVALIDATE_FOR = float(os.environ.get("ARXIV_CACHE_REVALIDATE_FOR", 24 * 60 * 60))
+
+# arXiv accepts a comma-separated id_list; keep batches small enough for a single response.
+MAX_IDS_PER_REQUEST = 50
+
+# Large searches are split into pages of ARXIV_PAGE_SIZE papers that are fetched concurrently.
+# At most ARXIV_MAX_PARALLEL_PAGES pages are in flight at once, and no more pages are requested after a short one.
+ARXIV_PAGE_SIZE = int(os.environ.get("ARXIV_PAGE_SIZE", "200"))
+ARXIV_MAX_PARALLEL_PAGES = int(os.environ.get("ARXIV_MAX_PARALLEL_PAGES", "3"))
+# arXiv returns at most this many results for one search, however they are paged
+ARXIV_MAX_RESULTS = 30000
+
+# Every arXiv request of the process waits for a token of one shared token bucket (see arxiv_core.fetch.UpstreamScheduler).
+# The bucket refills at one request per ARXIV_REQUEST_DELAY seconds, as the arXiv API terms of use ask, and holds
+# up to ARXIV_REQUEST_BURST tokens, so a few requests after a quiet period start at once. 0 turns the limit off.
+# The uvicorn workers of 8_mcp_docker_server.py each have their own bucket, so the rate is split between MCP_WORKERS.
+ARXIV_REQUEST_DELAY = float(os.environ.get("ARXIV_REQUEST_DELAY", "3"))
+ARXIV_REQUEST_BURST = int(os.environ.get("ARXIV_REQUEST_BURST", "4"))
+MCP_WORKERS = int(os.environ.get("MCP_WORKERS", "1"))
+
+# Parsed papers are streamed to the client in batches of this size while a search is running
+PARTIAL_RESULTS_BATCH = 25
+# Logger name of the log notifications that carry partial results
+PARTIAL_RESULTS_LOGGER = "fetch_arxiv_papers.partial_results"
+
+# Maximum number of tool calls McpSession.call_tools keeps in flight over one MCP session
+MCP_MAX_CONCURRENT_CALLS = int(os.environ.get("MCP_MAX_CONCURRENT_CALLS", "8"))
+
+# Set MCP_REPORT_TOOL_TOKENS=1 to have the MCP agents print, at startup, how many tokens the compact tool summary
+# saves over str(list_tools()). It costs two Gemini count_tokens calls, so it is off by default.
+MCP_REPORT_TOOL_TOKENS = os.environ.get("MCP_REPORT_TOOL_TOKENS", "0") == "1"
+
+# Folder shared by all uvicorn workers for their Prometheus metrics (see arxiv_core.metrics).
+# prometheus_client reads it when it is imported, so it must be set before the server starts.
+PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# OpenTelemetry tracing (see arxiv_core.tracing). Spans are appended to ARXIV_TRACES_FILE as JSON lines and/or
+# sent to the OTLP/HTTP collector at OTEL_EXPORTER_OTLP_ENDPOINT. Tracing is off if neither is set.
+ARXIV_TRACES_FILE = os.environ.get("ARXIV_TRACES_FILE")
+OTEL_EXPORTER_OTLP_ENDPOINT = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+
+# Structured logging (see arxiv_core.log), written to ARXIV_LOG_FILE or stderr, never to stdout.
+# ARXIV_LOG_LEVEL=OFF turns it off. ARXIV_LOG_FORMAT is 'text' (key=value) or 'json' (one object per line).
+# Only a share of ARXIV_LOG_SAMPLE_RATE of the INFO and DEBUG records is kept; warnings and errors always are.
+ARXIV_LOG_LEVEL = os.environ.get("ARXIV_LOG_LEVEL", "INFO").upper()
+ARXIV_LOG_FILE = os.environ.get("ARXIV_LOG_FILE")
+ARXIV_LOG_FORMAT = os.environ.get("ARXIV_LOG_FORMAT", "text")
+ARXIV_LOG_SAMPLE_RATE = float(os.environ.get("ARXIV_LOG_SAMPLE_RATE", "1"))
+
+# Folder where save_md_to_file writes its reports
+REPORTS_DIR = "./reports"
@@ -0,0 +1,416 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+import httpx
+from opentelemetry import trace
+from arxiv_core.config import (
+    ARXIV_HEDGE_MIN_DELAY,
+    ARXIV_HEDGE_MIN_SAMPLES,
+    ARXIV_HEDGE_PERCENTILE,
+    ARXIV_MAX_CONNECTIONS,
+    ARXIV_MAX_KEEPALIVE,
+    ARXIV_MAX_RETRIES,
+    ARXIV_RETRY_BASE_DELAY,
+    ARXIV_RETRY_MAX_DELAY,
+    ARXIV_TIMEOUT,
+)
+from arxiv_core.log import get_logger, log_event
+from arxiv_core.metrics import UPSTREAM_HEDGES, UPSTREAM_LATENCY, UPSTREAM_QUEUED, UPSTREAM_RATE, UPSTREAM_REQUESTS, UPSTREAM_RETRIES
+from arxiv_core.tracing import tracer
+
+log = get_logger("fetch")
+
+# Priorities of the UpstreamScheduler queue; lower values are served first
+PRIORITY_INTERACTIVE = 0  # single-abstract lookups, where a user is waiting on one small answer
+PRIORITY_NORMAL = 1       # single-page searches and batched abstract lookups
+PRIORITY_BULK = 2         # the pages of large paginated sweeps
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_NORMAL: "normal", PRIORITY_BULK: "bulk"}
+
+# Status codes with which arXiv asks clients to slow down
+THROTTLE_STATUSES = (429, 503)
+# Status codes of transient failures that are worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_http_client = None
+_http_client_loop = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared async HTTP client, creating it on first use.
+
+    The client is created lazily so that it is bound to the running event loop. A new client
+    is created if it is used from a different loop (e.g., by the synchronous helpers in arxiv_core.sync).
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ARXIV_MAX_CONNECTIONS,
+                max_keepalive_connections=ARXIV_MAX_KEEPALIVE,
+            ),
+            timeout=ARXIV_TIMEOUT,
+        )
+        _http_client_loop = loop
+    return _http_client
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date. Returns None if it is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class LatencyTracker:
+    """
+    Keeps the last `size` latencies and returns their percentiles.
+    """
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 1) -> float | None:
+        """
+        Returns the p-th percentile of the kept latencies, or None if fewer than `min_samples` are kept.
+        """
+        if len(self._samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+# Times to first byte of the recent arXiv responses, per query type; they set the hedging delay
+response_times = {"search": LatencyTracker(), "id_list": LatencyTracker()}
+
+def backoff_delay(retry: int) -> float:
+    """
+    Returns how long to wait before retry number `retry` (0 for the first): a random time of up to
+    ARXIV_RETRY_BASE_DELAY * 2**retry seconds, capped at ARXIV_RETRY_MAX_DELAY.
+    """
+    return random.uniform(0, min(ARXIV_RETRY_MAX_DELAY, ARXIV_RETRY_BASE_DELAY * 2 ** retry))
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Returns True for errors that a later attempt of the same request may not hit: network errors, timeouts,
+    and 429 or 5xx responses.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRY_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+def response_validators(resp: httpx.Response) -> dict:
+    """
+    Returns the cache validators of a response (its ETag and Last-Modified headers), leaving out the missing ones.
+    """
+    validators = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+    return {name: value for name, value in validators.items() if value}
+
+def conditional_headers(validators: dict | None) -> dict:
+    """
+    Returns the If-None-Match and If-Modified-Since headers that turn a GET into a conditional one, to which
+    the server answers 304 Not Modified with an empty body if the resource did not change since `validators`.
+    """
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def record_request(query: str, status: str, elapsed: float, queued: float, size: int, url: str):
+    """
+    Counts, times and logs one request sent to arXiv.
+    """
+    UPSTREAM_LATENCY.labels(query).observe(elapsed)
+    UPSTREAM_REQUESTS.labels(query, status).inc()
+    # 2xx and 304 Not Modified are both successful answers
+    log_event(log, logging.INFO if status[0] in "23" else logging.WARNING, "arxiv_request",
+              query=query, status=status, seconds=round(elapsed, 3), queued=round(queued, 3), bytes=size, url=url)
+
+async def send_request(url: str, query: str, scheduler, headers: dict | None = None) -> tuple:
+    """
+    Sends one GET request and returns the response once its headers have arrived, with the body still unread,
+    together with the perf_counter time the request was sent at.
+
+    The status is reported to the scheduler, and the time to first byte to the hedging statistics.
+    Raises httpx.HTTPStatusError for error statuses (after closing the response).
+    """
+    started = time.perf_counter()
+    client = get_http_client()
+    try:
+        resp = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+    except httpx.TransportError:
+        record_request(query, "error", time.perf_counter() - started, 0.0, 0, url)
+        raise
+    response_times[query].add(time.perf_counter() - started)
+    if scheduler is not None:
+        if resp.status_code in THROTTLE_STATUSES:
+            scheduler.throttled(retry_after_seconds(resp.headers.get("Retry-After")))
+        elif resp.is_success or resp.status_code == 304:
+            scheduler.succeeded()
+    if resp.is_error:
+        await resp.aclose()
+        record_request(query, str(resp.status_code), time.perf_counter() - started, 0.0, 0, url)
+        resp.raise_for_status()
+    return resp, started
+
+def close_late_response(task: asyncio.Task):
+    # Done callback of a cancelled hedging race task, in case its response arrived before the cancellation did
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(task.result()[0].aclose())
+
+async def send_hedged(url: str, query: str, scheduler, span, headers: dict | None = None) -> tuple:
+    """
+    Sends a request, and a second identical one if the first is slower than the hedging delay
+    (see ARXIV_HEDGE_PERCENTILE). Returns the first successful (response, started) pair of send_request,
+    and cancels the other request.
+    """
+    primary = asyncio.ensure_future(send_request(url, query, scheduler, headers))
+    pending = {primary}
+    hedge_delay = None
+    if ARXIV_HEDGE_PERCENTILE > 0:
+        hedge_delay = response_times[query].percentile(ARXIV_HEDGE_PERCENTILE, ARXIV_HEDGE_MIN_SAMPLES)
+    if hedge_delay is not None:
+        done, pending = await asyncio.wait(pending, timeout=max(ARXIV_HEDGE_MIN_DELAY, hedge_delay))
+        # The hedge never waits in the scheduler's queue: it is only worth sending right away
+        if not done and (scheduler is None or scheduler.try_acquire()):
+            pending.add(asyncio.ensure_future(send_request(url, query, scheduler, headers)))
+            span.add_event("hedge", {"arxiv.hedge_delay_ms": round(hedge_delay * 1000, 1)})
+        pending |= done
+
+    hedged = len(pending) > 1
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if hedged:
+                        UPSTREAM_HEDGES.labels(query, "primary" if task is primary else "hedge").inc()
+                    # A request that completed at the same time is not needed
+                    for other in done - {task}:
+                        if other.exception() is None:
+                            await other.result()[0].aclose()
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+            task.add_done_callback(close_late_response)
+
+async def stream_url(url: str, scheduler=None, priority: int = PRIORITY_NORMAL, headers: dict | None = None, on_response=None):
+    """
+    Streams the response body of the given URL through the shared connection pool, chunk by chunk.
+
+    `headers` are sent with every attempt, e.g. the conditional_headers of a cached result. If `on_response`
+    is given, it is called with the response once its headers have arrived, before the first chunk is yielded;
+    a 304 Not Modified response has no chunks at all.
+
+    If a scheduler (UpstreamScheduler) is given, each attempt first waits for its turn at `priority`, and the
+    response status is reported back to it, so a 429 or 503 slows down every later request.
+    Network errors, timeouts, 429 and 5xx responses are retried with exponential backoff and jitter (see
+    ARXIV_MAX_RETRIES), and slow requests may be hedged (see send_hedged). Once the first chunk was yielded,
+    an error is raised as is, since the caller has already parsed part of the response.
+
+    Every attempt is counted by HTTP status (or 'error' if no response arrived), timed until the body is read, and logged.
+    The span splits the time into waiting for the scheduler (arxiv.queue_seconds), waiting for arXiv
+    (arxiv.network_seconds) and the time the caller spends between chunks, i.e. parsing the feed (arxiv.parse_seconds).
+
+    Raises:
+        httpx.HTTPError: If the last attempt fails or the server responds with a non-retryable error status.
+    """
+    query = "id_list" if "id_list=" in url else "search"
+    # Not the current span: the generator is suspended at every chunk, and the caller's context must stay untouched
+    span = tracer.start_span(f"GET arXiv {query}", kind=trace.SpanKind.CLIENT, attributes={"http.request.method": "GET", "url.full": url})
+    queue_seconds = network_seconds = parse_seconds = 0.0
+    size = 0
+    try:
+        for attempt in range(ARXIV_MAX_RETRIES + 1):
+            queued = time.perf_counter()
+            if scheduler is not None:
+                await scheduler.acquire(priority)
+            queue_seconds += time.perf_counter() - queued
+            try:
+                resp, started = await send_hedged(url, query, scheduler, span, headers)
+                break
+            except httpx.HTTPError as e:
+                if attempt == ARXIV_MAX_RETRIES or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                UPSTREAM_RETRIES.labels(query).inc()
+                span.add_event("retry", {"arxiv.error": repr(e), "arxiv.retry_delay_ms": round(delay * 1000, 1)})
+                await asyncio.sleep(delay)
+
+        span.set_attributes({
+            "http.response.status_code": resp.status_code,
+            "arxiv.attempts": attempt + 1,
+            "arxiv.time_to_first_byte_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+        try:
+            if on_response is not None:
+                on_response(resp)
+            waiting = time.perf_counter()
+            async for chunk in resp.aiter_bytes():
+                resumed = time.perf_counter()
+                network_seconds += resumed - waiting
+                size += len(chunk)
+                yield chunk
+                waiting = time.perf_counter()
+                parse_seconds += waiting - resumed
+        finally:
+            await resp.aclose()
+            record_request(query, str(resp.status_code), time.perf_counter() - started, queue_seconds, size, url)
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(trace.StatusCode.ERROR, str(e))
+        raise
+    finally:
+        span.set_attributes({
+            "http.response.body.size": size,
+            "arxiv.queue_seconds": round(queue_seconds, 6),
+            "arxiv.network_seconds": round(network_seconds, 6),
+            "arxiv.parse_seconds": round(parse_seconds, 6),
+        })
+        span.end()
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls so that they share a single execution.
+
+    The first caller for a key starts the call; every caller that arrives while it is
+    still running awaits the same task and receives the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key: str, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._calls.pop(key, None) if self._calls.get(key) is t else None)
+        # Shield the shared task so that one cancelled waiter does not cancel it for the others
+        return await asyncio.shield(task)
+
+class UpstreamScheduler:
+    """
+    Token bucket that schedules every request a process sends to the arXiv API.
+
+    The bucket refills at `rate` tokens per second up to `burst` tokens, and each request takes one token.
+    Requests that find the bucket empty wait in a queue ordered by priority (PRIORITY_INTERACTIVE first,
+    PRIORITY_BULK last), and in arrival order within a priority.
+
+    The rate adapts to arXiv: when a response is throttled (429 or 503), no request starts until its Retry-After
+    has passed, and the rate is halved, down to `rate` / 16. Every successful response raises it again by
+    `rate` / 8, back up to `rate`. An infinite `rate` turns the limit off, but Retry-After pauses still apply.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._order = itertools.count()
+        self._dispatcher = None
+        UPSTREAM_RATE.set(rate if math.isfinite(rate) else 0)
+
+    def _refill(self, now: float):
+        if math.isinf(self.rate):
+            self._tokens = self.burst
+        else:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL):
+        """
+        Waits until a request at this priority may start.
+        """
+        # Fast path: nothing is queued, so a free token can be taken without waiting
+        if self.try_acquire():
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        UPSTREAM_QUEUED.labels(PRIORITY_NAMES.get(priority, str(priority))).inc()
+        try:
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = asyncio.ensure_future(self._dispatch())
+            await future
+        finally:
+            UPSTREAM_QUEUED.labels(PRIORITY_NAMES.get(priority, str(priority))).dec()
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token if one is free right now and no request is queued or paused. Never waits.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self._paused_until and self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def _dispatch(self):
+        # Hands out tokens to the queued requests, highest priority first, until the queue is empty
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                # The waiting request was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+            elif self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+            else:
+                heapq.heappop(self._waiters)
+                self._tokens -= 1
+                future.set_result(None)
+
+    def throttled(self, retry_after: float | None = None):
+        """
+        Reports a throttled response: pauses all requests for `retry_after` seconds (one token interval
+        if not given) and halves the rate.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if retry_after is None:
+            retry_after = 1 / self.rate if math.isfinite(self.rate) else 1.0
+        self._paused_until = max(self._paused_until, now + retry_after)
+        self._tokens = min(self._tokens, 0.0)
+        if math.isfinite(self.rate):
+            self.rate = max(self.min_rate, self.rate / 2)
+            UPSTREAM_RATE.set(self.rate)
+        log_event(log, logging.WARNING, "arxiv_throttled", retry_after=round(retry_after, 3), rate=round(self.rate, 4))
+
+    def succeeded(self):
+        """
+        Reports a successful response: raises the rate one step back towards the configured rate.
+        """
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 8)
+            UPSTREAM_RATE.set(self.rate)
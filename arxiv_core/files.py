@@ -0,0 +1,32 @@
+import logging
+import os
+import re
+from arxiv_core.config import REPORTS_DIR
+from arxiv_core.log import get_logger, log_event
+from arxiv_core.tracing import tracer
+
+log = get_logger("files")
+
+def save_markdown(text: str, filename: str) -> str:
+    """
+    Writes Markdown text to a .md file in the reports folder and returns the path of the file.
+
+    The folder is created if it doesn't exist. Special characters in the filename are replaced
+    with hyphens, and '.md' is appended if not present.
+    """
+    # Create reports folder if it doesn't exist
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    # Sanitize filename to avoid issues with special characters
+    filename = re.sub(r'[<>:"/\\|?*]', '-', filename)
+    if not filename.endswith('.md'):
+        filename += '.md'
+
+    # Set path to ./reports
+    filepath = os.path.join(REPORTS_DIR, filename)
+
+    with tracer.start_as_current_span("save_markdown", attributes={"file.path": filepath, "file.size": len(text)}):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
+    log_event(log, logging.INFO, "report_saved", path=filepath, chars=len(text))
+    return filepath
@@ -0,0 +1,100 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from arxiv_core.config import ARXIV_LOG_FILE, ARXIV_LOG_FORMAT, ARXIV_LOG_LEVEL, ARXIV_LOG_SAMPLE_RATE
+
+# Structured logging for arxiv_core and the MCP servers.
+# Records go to stderr or ARXIV_LOG_FILE, never to stdout: under the stdio transport of 4_mcp_server.py,
+# stdout carries the MCP messages. The calling code only puts records on a queue; a background thread
+# formats and writes them, so a slow terminal or disk never holds up a tool call.
+#
+# USE COMMANDS:
+# ARXIV_LOG_LEVEL=DEBUG ARXIV_LOG_FORMAT=json ARXIV_LOG_FILE=arxiv.log python 8_mcp_docker_server.py
+# ARXIV_LOG_SAMPLE_RATE=0.01 python 8_mcp_docker_server.py   (keep 1% of the per-call records)
+# ARXIV_LOG_LEVEL=OFF python 4_mcp_server.py                  (no logging at all)
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a share of `rate` of the records below WARNING, picked at random. Warnings and errors are always kept.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats a record and its fields (see log_event) as one JSON object, or as `key=value` pairs after the message.
+    """
+    def __init__(self, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def formatTime(self, record: logging.LogRecord, datefmt=None) -> str:
+        return datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        if self.json_lines:
+            line = {"time": self.formatTime(record), "level": record.levelname, "logger": record.name, "event": record.getMessage(), **fields}
+            if record.exc_info:
+                line["exception"] = self.formatException(record.exc_info)
+            return json.dumps(line, default=str, ensure_ascii=False)
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.name} {record.getMessage()}"
+        line += "".join(f" {key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+def setup_logging() -> logging.Logger:
+    """
+    Configures the 'arxiv_core' logger from the ARXIV_LOG_* settings, and returns it.
+
+    With ARXIV_LOG_LEVEL=OFF the logger drops every record before one is created, and no thread is started.
+    Otherwise records pass the sampling filter, go through a queue, and are written by a background listener
+    that is flushed when the process exits.
+    """
+    logger = logging.getLogger("arxiv_core")
+    # Records are written here only, not again by handlers on the root logger
+    logger.propagate = False
+    if ARXIV_LOG_LEVEL == "OFF":
+        logger.setLevel(logging.CRITICAL + 1)
+        return logger
+    logger.setLevel(ARXIV_LOG_LEVEL)
+
+    handler = logging.FileHandler(ARXIV_LOG_FILE, encoding="utf-8") if ARXIV_LOG_FILE else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(StructuredFormatter(json_lines=ARXIV_LOG_FORMAT == "json"))
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    if ARXIV_LOG_SAMPLE_RATE < 1:
+        queue_handler.addFilter(SamplingFilter(ARXIV_LOG_SAMPLE_RATE))
+    logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return logger
+
+logger = setup_logging()
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns a child of the 'arxiv_core' logger, e.g. get_logger("api") for 'arxiv_core.api'.
+    """
+    return logger.getChild(name)
+
+def log_event(log: logging.Logger, level: int, event: str, **fields):
+    """
+    Logs an event with structured fields, e.g. log_event(log, logging.INFO, "arxiv_request", status=200).
+
+    Nothing is formatted here: the fields are kept on the record and formatted by the background listener.
+    """
+    if log.isEnabledFor(level):
+        log.log(level, event, extra={"fields": fields})
@@ -0,0 +1,25 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Prometheus metrics for the MCP servers, exposed on /metrics by 8_mcp_docker_server.py.
+# The arXiv and cache metrics are recorded by arxiv_core.fetch and arxiv_core.cache; the tool,
+# session and HTTP metrics by the middleware in arxiv_core.middleware.
+# With several uvicorn workers, PROMETHEUS_MULTIPROC_DIR must be set so /metrics aggregates all workers.
+
+# Upper bounds in seconds; arXiv calls range from a few milliseconds (cache hits) to tens of seconds (large sweeps)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+TOOL_CALLS = Counter("mcp_tool_calls_total", "MCP tool calls by tool and result status", ["tool", "status"])
+TOOL_LATENCY = Histogram("mcp_tool_call_duration_seconds", "MCP tool call latency", ["tool"], buckets=LATENCY_BUCKETS)
+TOOL_CALLS_IN_FLIGHT = Gauge("mcp_tool_calls_in_flight", "MCP tool calls currently running", ["tool"], multiprocess_mode="livesum")
+
+UPSTREAM_REQUESTS = Counter("arxiv_upstream_requests_total", "Requests to the arXiv API by query type and HTTP status", ["query", "status"])
+UPSTREAM_LATENCY = Histogram("arxiv_upstream_request_duration_seconds", "arXiv API request latency, until the body is read", ["query"], buckets=LATENCY_BUCKETS)
+UPSTREAM_RETRIES = Counter("arxiv_upstream_retries_total", "Retried arXiv API requests by query type", ["query"])
+UPSTREAM_HEDGES = Counter("arxiv_upstream_hedged_requests_total", "Hedged arXiv API requests by query type and the request that answered first", ["query", "winner"])
+UPSTREAM_QUEUED = Gauge("arxiv_upstream_queued_requests", "arXiv API requests waiting for the rate limiter, by priority", ["priority"], multiprocess_mode="livesum")
+UPSTREAM_RATE = Gauge("arxiv_upstream_rate_limit", "arXiv API requests per second the rate limiter currently allows", multiprocess_mode="livesum")
+
+CACHE_LOOKUPS = Counter("arxiv_cache_lookups_total", "arXiv cache lookups by endpoint and result (hit, miss or revalidated)", ["endpoint", "result"])
+
+ACTIVE_SESSIONS = Gauge("mcp_active_sessions", "Streamable HTTP sessions that are open", multiprocess_mode="livesum")
+HTTP_REQUESTS_IN_FLIGHT = Gauge("mcp_http_requests_in_flight", "HTTP requests being handled, including open SSE streams", multiprocess_mode="livesum")
@@ -0,0 +1,132 @@
+import logging
+import time
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from opentelemetry import trace
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from arxiv_core.config import PROMETHEUS_MULTIPROC_DIR
+from arxiv_core.log import get_logger, log_event
+from arxiv_core.metrics import ACTIVE_SESSIONS, HTTP_REQUESTS_IN_FLIGHT, TOOL_CALLS, TOOL_CALLS_IN_FLIGHT, TOOL_LATENCY
+from arxiv_core.tracing import extract_meta, tracer
+
+# Server-side instrumentation for the metrics in arxiv_core.metrics, the traces of arxiv_core.tracing and
+# the logs of arxiv_core.log, and the /metrics endpoint.
+
+log = get_logger("tools")
+
+class MetricsMiddleware(Middleware):
+    """
+    FastMCP middleware that counts and times every tool call.
+
+    A call's status is the 'status' of the tool's structured response ('success' or 'error'),
+    or 'exception' if the tool raised.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        TOOL_CALLS_IN_FLIGHT.labels(tool).inc()
+        started = time.perf_counter()
+        status = "exception"
+        try:
+            result = await call_next(context)
+            status = (getattr(result, "structured_content", None) or {}).get("status", "success")
+            return result
+        finally:
+            TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+            TOOL_CALLS.labels(tool, status).inc()
+            TOOL_CALLS_IN_FLIGHT.labels(tool).dec()
+
+class LoggingMiddleware(Middleware):
+    """
+    FastMCP middleware that logs every tool call with its status and duration.
+
+    Successful calls are logged at INFO, so ARXIV_LOG_SAMPLE_RATE thins them out under load;
+    'error' responses and exceptions are logged at WARNING and always kept.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception as e:
+            log_event(log, logging.WARNING, "tool_call", tool=tool, status="exception", seconds=round(time.perf_counter() - started, 3), error=repr(e))
+            raise
+        response = getattr(result, "structured_content", None) or {}
+        status = response.get("status", "success")
+        if status == "error":
+            log_event(log, logging.WARNING, "tool_call", tool=tool, status=status, seconds=round(time.perf_counter() - started, 3), message=response.get("message"))
+        else:
+            log_event(log, logging.INFO, "tool_call", tool=tool, status=status, seconds=round(time.perf_counter() - started, 3))
+        return result
+
+class TracingMiddleware(Middleware):
+    """
+    FastMCP middleware that runs every tool call in a server span.
+
+    The span continues the client's trace if the tools/call request carries a traceparent in its _meta field
+    (see arxiv_core.session), and is marked as failed if the tool returns an 'error' status or raises.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        meta = context.fastmcp_context.request_context.meta if context.fastmcp_context is not None else None
+        with tracer.start_as_current_span(
+            f"tools/call {tool}",
+            context=extract_meta(meta),
+            kind=trace.SpanKind.SERVER,
+            attributes={"mcp.method.name": "tools/call", "gen_ai.tool.name": tool},
+        ) as span:
+            result = await call_next(context)
+            response = getattr(result, "structured_content", None) or {}
+            if response.get("status") == "error":
+                span.set_status(trace.StatusCode.ERROR, response.get("message"))
+            return result
+
+class SessionMetricsMiddleware:
+    """
+    ASGI middleware that tracks open Streamable HTTP sessions and in-flight HTTP requests.
+
+    A session is counted when a response hands out a new mcp-session-id, and uncounted
+    when the client ends it with a DELETE request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sessions = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        session_id = headers.get(b"mcp-session-id")
+
+        async def send_and_track(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"mcp-session-id" and value not in self.sessions:
+                        self.sessions.add(value)
+                        ACTIVE_SESSIONS.inc()
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_and_track)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            if scope["method"] == "DELETE" and session_id in self.sessions:
+                self.sessions.discard(session_id)
+                ACTIVE_SESSIONS.dec()
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Serves the metrics in the Prometheus text format, aggregated over all workers in multi-worker mode.
+    """
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
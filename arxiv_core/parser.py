@@ -0,0 +1,148 @@
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+
+# Fully qualified tag names, resolved once instead of matching "{*}" wildcards on every lookup
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ENTRY = ATOM_NS + "entry"
+ID = ATOM_NS + "id"
+TITLE = ATOM_NS + "title"
+PUBLISHED = ATOM_NS + "published"
+SUMMARY = ATOM_NS + "summary"
+AUTHOR = ATOM_NS + "author"
+NAME = ATOM_NS + "name"
+LINK = ATOM_NS + "link"
+
+# Size of the chunks read from the HTTP response and fed to the parser
+CHUNK_SIZE = 64 * 1024
+
+@dataclass(slots=True)
+class Paper:
+    """
+    Compact record of a parsed arXiv paper.
+
+    Papers are kept as slotted objects while they are parsed, merged and cached in memory,
+    and are converted to plain dictionaries only when they are returned from a tool.
+    """
+
+    arxiv_id: str | None
+    title: str | None
+    authors: tuple
+    published: str | None
+    pdf_link: str | None
+
+    def to_dict(self) -> dict:
+        """
+        Returns the paper as a JSON-serializable dictionary, as documented by the fetch_arxiv_papers tools.
+        """
+        return {
+            'arxiv_id': self.arxiv_id,
+            'title': self.title,
+            'authors': list(self.authors),
+            'published': self.published,
+            'pdf_link': self.pdf_link
+        }
+
+def paper_from_entry(entry: ET.Element) -> Paper:
+    """
+    Converts an Atom <entry> element into a Paper in a single pass over its children.
+    """
+    arxiv_id = title = published = pdf_link = None
+    authors = []
+    for child in entry:
+        tag = child.tag
+        if tag == ID:
+            arxiv_id = child.text.split("/")[-1] if child.text else None
+        elif tag == TITLE:
+            title = child.text
+        elif tag == PUBLISHED:
+            published = child.text
+        elif tag == AUTHOR:
+            authors.append(child.findtext(NAME))
+        elif tag == LINK and pdf_link is None and child.get("type") == "application/pdf":
+            pdf_link = child.get("href")
+    return Paper(arxiv_id, title, tuple(authors), published, pdf_link)
+
+def abstract_from_entry(entry: ET.Element) -> tuple:
+    """
+    Extracts the versioned arXiv ID (e.g., "2301.12345v2") and the abstract text from an Atom <entry> element.
+    """
+    full_id = entry.findtext(ID)
+    return (full_id.split("/abs/")[-1] if full_id else None, entry.findtext(SUMMARY))
+
+def read_chunks(resp):
+    """
+    Yields the body of a file-like HTTP response in chunks, so it can be parsed while it is being received.
+    """
+    return iter(lambda: resp.read(CHUNK_SIZE), b"")
+
+class AtomFeedParser:
+    """
+    Incremental parser for arXiv Atom feeds.
+
+    Feed it the response body chunk by chunk; every call returns the entries whose closing
+    </entry> tag has been seen so far, converted with `entry_fn`. Processed entries are
+    removed from the tree, so memory use stays flat regardless of the feed size.
+
+    Args:
+        entry_fn (callable, optional): Converts an <entry> element into a result. Defaults to paper_from_entry.
+    """
+
+    def __init__(self, entry_fn=paper_from_entry):
+        self.entry_fn = entry_fn
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+
+    def feed(self, chunk: bytes) -> list:
+        self._parser.feed(chunk)
+        return self._read_entries()
+
+    def close(self) -> list:
+        self._parser.close()
+        return self._read_entries()
+
+    def _read_entries(self) -> list:
+        results = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+            elif elem.tag == ENTRY:
+                results.append(self.entry_fn(elem))
+                self._root.remove(elem)
+        return results
+
+def iter_entries(chunks, entry_fn=paper_from_entry):
+    """
+    Parses an iterable of byte chunks and yields each entry as soon as it is complete.
+    """
+    parser = AtomFeedParser(entry_fn)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+async def aiter_entries(chunks, entry_fn=paper_from_entry):
+    """
+    Parses an async iterable of byte chunks and yields each entry as soon as it is complete.
+    """
+    parser = AtomFeedParser(entry_fn)
+    async for chunk in chunks:
+        for result in parser.feed(chunk):
+            yield result
+    for result in parser.close():
+        yield result
+
+def match_abstracts(pairs, arxiv_ids: list[str]) -> dict:
+    """
+    Maps each requested ID to its abstract, given the (versioned ID, abstract) pairs of a feed.
+
+    IDs may be given with or without a version suffix (e.g., "2301.12345" or "2301.12345v2").
+    Requested IDs with no matching entry are mapped to None.
+    """
+    by_id = {}
+    for versioned_id, abstract in pairs:
+        if not versioned_id:
+            continue
+        by_id[versioned_id] = abstract
+        by_id.setdefault(re.sub(r"v\d+$", "", versioned_id), abstract)
+    return {arxiv_id: by_id.get(arxiv_id) for arxiv_id in arxiv_ids}
@@ -0,0 +1,289 @@
+import asyncio
+import datetime
+import anyio
+import httpx
+import mcp.types
+from fastmcp import Client
+from fastmcp.client.messages import MessageHandler
+from opentelemetry import trace
+from arxiv_core import sync
+from arxiv_core.api import get_cache
+from arxiv_core.config import MCP_MAX_CONCURRENT_CALLS
+from arxiv_core.tracing import inject_meta, tracer
+
+# Long-lived MCP client sessions.
+# `async with client:` around every tool call repeats the MCP handshake each time, and with a
+# stdio client such as Client("4_mcp_server.py") it can also spawn a new server process.
+# McpSession connects once, runs every call over the same session, and reconnects only when
+# the connection is lost.
+
+# Errors that mean the connection to the server is gone, rather than that the call itself failed
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+class ToolListChangedHandler(MessageHandler):
+    """
+    Drops the session's cached tool list when the server sends notifications/tools/list_changed.
+
+    Every message is also passed on to the message handler the session was created with, if any.
+    """
+    def __init__(self, session, message_handler=None):
+        self.session = session
+        self.message_handler = message_handler
+
+    async def dispatch(self, message) -> None:
+        if self.message_handler is not None:
+            await self.message_handler(message)
+        await super().dispatch(message)
+
+    async def on_tool_list_changed(self, message: mcp.types.ToolListChangedNotification) -> None:
+        await self.session.invalidate_tools()
+
+class TracingClient(Client):
+    """
+    fastmcp Client that sends the current trace context in the _meta field of every tools/call request.
+
+    The server continues the trace from it (see arxiv_core.middleware.TracingMiddleware). Without an active
+    trace, requests are sent exactly as Client sends them. Traced results are still validated against the
+    tool's output schema, as ClientSession.call_tool does; if the mcp package no longer has that private
+    check, the request is sent without the trace context rather than unvalidated.
+    """
+    async def call_tool_mcp(self, name: str, arguments: dict, progress_handler=None, timeout=None) -> mcp.types.CallToolResult:
+        meta = inject_meta()
+        validate = getattr(self.session, "_validate_tool_result", None)
+        if meta is None or validate is None:
+            return await super().call_tool_mcp(name, arguments, progress_handler, timeout)
+        if isinstance(timeout, int | float):
+            timeout = datetime.timedelta(seconds=timeout)
+        # Only newer mcp releases let ClientSession.call_tool set _meta, so the request is built here
+        request = mcp.types.ClientRequest(mcp.types.CallToolRequest(
+            method="tools/call",
+            params=mcp.types.CallToolRequestParams(name=name, arguments=arguments, _meta=meta),
+        ))
+        result = await self.session.send_request(
+            request,
+            mcp.types.CallToolResult,
+            request_read_timeout_seconds=timeout,
+            progress_callback=progress_handler or self._progress_handler,
+        )
+        if not result.isError:
+            await validate(name, result)
+        return result
+
+class McpSession:
+    """
+    Keeps one fastmcp Client connected and runs many tool calls over it.
+
+    The client connects on first use and stays connected until close() is called. If a call fails
+    because the connection was lost (e.g. the stdio server process exited or the HTTP server restarted),
+    the session reconnects once and retries the call. Tool errors are raised as usual.
+
+    The tool list is cached in memory and in the on-disk cache, keyed by the transport and the server's
+    name and version, so later sessions with the same server skip the tools/list round trip. The cached
+    list also fills the output schemas the MCP client validates tool results against, which it would
+    otherwise fetch with tools/list on the first call of each tool. The cached list is dropped when the
+    server sends notifications/tools/list_changed.
+
+    Use the async methods from one event loop, or the *_sync methods from scripts without an event loop.
+    The *_sync methods run on the arxiv_core.sync background loop, so the connection stays warm between calls.
+    """
+    def __init__(self, transport, **client_kwargs):
+        client_kwargs["message_handler"] = ToolListChangedHandler(self, client_kwargs.get("message_handler"))
+        self.client = TracingClient(transport, **client_kwargs)
+        self._tools = None
+        self._lock = None
+        # Incremented on every new connection, so concurrent calls that fail together reconnect only once
+        self._generation = 0
+
+    async def connect(self) -> Client:
+        """
+        Connects the client if it is not connected yet, and returns it.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.client.is_connected():
+                await self.client.__aenter__()
+                self._generation += 1
+                # The server may have been replaced by another version; the on-disk cache still serves the same version
+                self._tools = None
+        return self.client
+
+    async def reconnect(self) -> Client:
+        """
+        Drops the current connection (and the stdio server process, if any) and connects again.
+        """
+        await self.client.close()
+        return await self.connect()
+
+    async def is_alive(self) -> bool:
+        """
+        Pings the server over the current session. Returns False if the session is not connected or is unusable.
+        """
+        if not self.client.is_connected():
+            return False
+        try:
+            return await self.client.ping()
+        except Exception:
+            return False
+
+    async def _call(self, method: str, *args, **kwargs):
+        client = await self.connect()
+        generation = self._generation
+        try:
+            return await getattr(client, method)(*args, **kwargs)
+        except CONNECTION_ERRORS:
+            async with self._lock:
+                # Another call may already have replaced the broken connection
+                if self._generation == generation:
+                    await self.client.close()
+            client = await self.connect()
+            return await getattr(client, method)(*args, **kwargs)
+
+    async def call_tool(self, name: str, arguments: dict | None = None, **kwargs):
+        """
+        Calls a tool over the shared session. Accepts the same arguments as Client.call_tool.
+
+        The call runs in a client span whose context is sent to the server with the request.
+        """
+        await self.connect()
+        output_schemas = self._output_schemas()
+        if output_schemas is not None and name not in output_schemas:
+            await self.list_tools()
+        with tracer.start_as_current_span(
+            f"tools/call {name}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"mcp.method.name": "tools/call", "gen_ai.tool.name": name},
+        ):
+            return await self._call("call_tool", name, arguments, **kwargs)
+
+    async def iter_call_tools(self, calls: list, max_concurrency: int = MCP_MAX_CONCURRENT_CALLS, return_exceptions: bool = False):
+        """
+        Runs a batch of tool calls concurrently over the shared session and yields them as they complete.
+
+        Args:
+            calls (list): (tool_name, arguments) pairs.
+            max_concurrency (int, optional): The maximum number of calls in flight at once.
+            return_exceptions (bool, optional): If True, a failed call yields its exception instead of raising it.
+
+        Yields:
+            tuple: (index, result) pairs, where index is the position of the call in `calls`.
+        """
+        # List the tools once up front, rather than in every call of the batch
+        await self.list_tools()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(index: int, name: str, arguments: dict | None) -> tuple:
+            async with semaphore:
+                try:
+                    return index, await self.call_tool(name, arguments)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    return index, e
+
+        tasks = [asyncio.ensure_future(run(index, name, arguments)) for index, (name, arguments) in enumerate(calls)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call_tools(self, calls: list, max_concurrency: int = MCP_MAX_CONCURRENT_CALLS, return_exceptions: bool = False) -> list:
+        """
+        Runs a batch of tool calls concurrently over the shared session and returns the results in the order of `calls`.
+
+        See iter_call_tools for the arguments.
+        """
+        results = [None] * len(calls)
+        async for index, result in self.iter_call_tools(calls, max_concurrency, return_exceptions):
+            results[index] = result
+        return results
+
+    def _output_schemas(self) -> dict | None:
+        """
+        Returns the map of tool output schemas that ClientSession.call_tool (and Client.call_tool) validate
+        results against, sending tools/list for any tool missing from it.
+
+        The map is private to the mcp package, so if a release renames it, None is returned and the
+        client simply falls back to listing the tools itself.
+        """
+        return getattr(self.client.session, "_tool_output_schemas", None)
+
+    def _tools_cache_params(self) -> dict:
+        server_info = self.client.initialize_result.serverInfo
+        return {"transport": str(self.client.transport), "server": server_info.name, "version": server_info.version}
+
+    async def list_tools(self) -> list:
+        """
+        Lists the server's tools, from the cache if the same server version was listed before.
+        """
+        if self._tools is not None:
+            return self._tools
+        await self.connect()
+        params = self._tools_cache_params()
+        cached = await asyncio.to_thread(get_cache().get, "tools", params)
+        if cached is not None:
+            self._tools = [mcp.types.Tool.model_validate(tool) for tool in cached]
+            output_schemas = self._output_schemas()
+            if output_schemas is not None:
+                output_schemas.update({tool.name: tool.outputSchema for tool in self._tools})
+        else:
+            # Fills the output schema map as a side effect
+            self._tools = await self._call("list_tools")
+            await asyncio.to_thread(get_cache().set, "tools", params, [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in self._tools])
+        return self._tools
+
+    async def invalidate_tools(self):
+        """
+        Drops the cached tool list, so the next list_tools call asks the server again.
+        """
+        self._tools = None
+        if self.client.is_connected():
+            output_schemas = self._output_schemas()
+            if output_schemas is not None:
+                output_schemas.clear()
+            await asyncio.to_thread(get_cache().delete, "tools", self._tools_cache_params())
+
+    async def close(self):
+        """
+        Closes the session and the stdio server process, if any.
+        """
+        await self.client.close()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def call_tool_sync(self, name: str, arguments: dict | None = None, **kwargs):
+        """
+        Blocking version of call_tool for batch scripts.
+        """
+        return sync.run(self.call_tool(name, arguments, **kwargs))
+
+    def call_tools_sync(self, calls: list, max_concurrency: int = MCP_MAX_CONCURRENT_CALLS, return_exceptions: bool = False) -> list:
+        """
+        Blocking version of call_tools for batch scripts.
+        """
+        return sync.run(self.call_tools(calls, max_concurrency, return_exceptions))
+
+    def list_tools_sync(self) -> list:
+        """
+        Blocking version of list_tools for batch scripts.
+        """
+        return sync.run(self.list_tools())
+
+    def close_sync(self):
+        """
+        Blocking version of close for batch scripts.
+        """
+        sync.run(self.close())
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import threading
+from arxiv_core import api
+from arxiv_core.log import get_logger, log_event
+
+# Synchronous wrappers around arxiv_core.api for scripts without an event loop,
+# such as the Gemini function-calling agents in 2_ and 3_.
+# All calls run on one background event loop, so they share the connection pool,
+# the in-flight request coalescing and the request pacing with each other.
+
+log = get_logger("sync")
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="arxiv_core", daemon=True).start()
+    return _loop
+
+def run(coro):
+    """
+    Runs a coroutine on the background event loop and blocks until it returns.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+def get_papers(topic: str, number_of_papers: int = 3) -> list:
+    """
+    Returns the latest papers for a topic as dictionaries. Raises if the search fails.
+
+    If only some pages of a large search fail, the papers of the other pages are returned
+    and a warning names the offsets of the missing pages.
+    """
+    papers, failed_pages = run(api.get_papers(topic, number_of_papers))
+    if failed_pages:
+        log_event(
+            log, logging.WARNING, "pages_failed", topic=topic, papers=len(papers),
+            failed_offsets=[start for start, _ in failed_pages], first_error=repr(failed_pages[0][1]),
+        )
+    return papers
+
+def get_abstract(arxiv_id: str) -> str | None:
+    """
+    Returns the abstract of a single arXiv paper, or None if it is not found.
+    """
+    return run(api.get_abstract(arxiv_id))
+
+def get_abstracts(arxiv_ids: list[str]) -> dict:
+    """
+    Returns the abstracts of several arXiv papers keyed by ID; IDs that are not found map to None.
+    """
+    return run(api.get_abstracts(arxiv_ids))
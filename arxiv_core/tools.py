@@ -0,0 +1,156 @@
+import hashlib
+import json
+from fastmcp import Context
+from fastmcp.tools import Tool
+from arxiv_core.api import get_abstract, get_abstracts, get_papers
+from arxiv_core.config import ARXIV_MAX_RESULTS, PARTIAL_RESULTS_BATCH, PARTIAL_RESULTS_LOGGER
+from arxiv_core.files import save_markdown
+
+# MCP tool implementations shared by 4_mcp_server.py and 8_mcp_docker_server.py.
+# Every tool returns a structured {'status', 'data', 'message'} response instead of raising,
+# and its docstring is the tool description the MCP clients (and LLMs) see.
+
+async def report_papers(ctx: Context, papers: list, count: int, total: int):
+    """
+    Sends a batch of newly parsed papers to the client of the current tool call.
+
+    A progress notification reports how many papers are parsed so far (only sent if the client asked
+    for progress), and a log notification on the PARTIAL_RESULTS_LOGGER logger carries the papers themselves.
+    """
+    await ctx.report_progress(count, total, f"Parsed {count} of {total} papers")
+    await ctx.log(f"Parsed {count} of {total} papers", logger_name=PARTIAL_RESULTS_LOGGER, extra={"papers": [paper.to_dict() for paper in papers]})
+
+async def fetch_arxiv_papers(topic: str, number_of_papers: int = 3, ctx: Context = None) -> dict:
+    """
+    Retrieves the latest papers from arXiv matching a given topic.
+
+    Args:
+        topic (str): The search topic or keyword (e.g., "mcp", "machine learning").
+        number_of_papers (int, optional): The number of latest papers to retrieve. Defaults to 3.
+            At most 30000. Large requests are split into pages that are fetched in parallel.
+
+    Returns:
+        dict: A structured response with the following keys:
+            - 'status' (str): 'success' or 'error'.
+            - 'data' (list): A list of dictionaries, each representing a paper with keys:
+                - 'arxiv_id' (str): The arXiv identifier of the paper.
+                - 'title' (str): The title of the paper.
+                - 'authors' (list of str): List of author names.
+                - 'published' (str): Publication date in ISO format.
+                - 'pdf_link' (str): URL to the PDF of the paper.
+            - 'message' (str): A message describing the result or error.
+    """
+    try:
+        if not topic or not isinstance(topic, str):
+            return {"status": "error", "data": [], "message": "Invalid topic provided."}
+        if not isinstance(number_of_papers, int) or number_of_papers <= 0:
+            return {"status": "error", "data": [], "message": "Invalid number_of_papers provided."}
+        if number_of_papers > ARXIV_MAX_RESULTS:
+            return {"status": "error", "data": [], "message": f"number_of_papers must be at most {ARXIV_MAX_RESULTS}, arXiv's limit per search."}
+
+        # Stream partial results only when they would arrive in more than one batch
+        on_papers = None
+        if ctx is not None and number_of_papers > PARTIAL_RESULTS_BATCH:
+            on_papers = lambda batch, count: report_papers(ctx, batch, count, number_of_papers)
+        papers, failed_pages = await get_papers(topic, number_of_papers, on_papers)
+        if failed_pages:
+            start, error = failed_pages[0]
+            message = f"Fetched {len(papers)} papers, but {len(failed_pages)} page(s) failed (first failure at offset {start}: {error})."
+            return {"status": "success", "data": papers, "message": message}
+        return {"status": "success", "data": papers, "message": f"Fetched {len(papers)} papers successfully."}
+    except Exception as e:
+        return {"status": "error", "data": [], "message": f"An error occurred: {e}"}
+
+async def get_arxiv_abstract(arxiv_id: str) -> dict:
+    """
+    Fetches and returns the abstract of a specific arXiv paper.
+
+    Args:
+        arxiv_id (str): The arXiv ID (e.g., "2301.12345"). Must be a valid arXiv identifier.
+
+    Returns:
+        dict: A structured response with the following keys:
+            - 'status' (str): 'success' or 'error'.
+            - 'data' (str): The abstract text of the paper, or None if not found.
+            - 'message' (str): A message describing the result or error.
+    """
+    try:
+        if not arxiv_id or not isinstance(arxiv_id, str):
+            return {"status": "error", "data": None, "message": "Invalid arXiv ID provided."}
+
+        abstract = await get_abstract(arxiv_id)
+        if abstract is not None:
+            return {"status": "success", "data": abstract, "message": "Abstract fetched successfully."}
+        else:
+            return {"status": "error", "data": None, "message": "Paper not found."}
+    except Exception as e:
+        return {"status": "error", "data": None, "message": f"An error occurred: {e}"}
+
+async def get_arxiv_abstracts(arxiv_ids: list[str]) -> dict:
+    """
+    Fetches the abstracts of several arXiv papers in a single request.
+
+    Use this tool instead of calling get_arxiv_abstract once per paper. Up to
+    50 IDs are packed into one arXiv `id_list` query; longer lists are split into batches.
+
+    Args:
+        arxiv_ids (list of str): The arXiv IDs (e.g., ["2301.12345", "2301.67890"]).
+
+    Returns:
+        dict: A structured response with the following keys:
+            - 'status' (str): 'success' or 'error'.
+            - 'data' (dict): Maps each requested arXiv ID to its abstract text, or None if not found.
+            - 'message' (str): A message describing the result or error.
+    """
+    try:
+        if not arxiv_ids or not isinstance(arxiv_ids, list) or not all(isinstance(i, str) and i for i in arxiv_ids):
+            return {"status": "error", "data": {}, "message": "Invalid arXiv IDs provided."}
+
+        abstracts = await get_abstracts(arxiv_ids)
+        found = sum(1 for abstract in abstracts.values() if abstract is not None)
+        return {"status": "success", "data": abstracts, "message": f"Fetched {found} of {len(abstracts)} abstracts successfully."}
+    except Exception as e:
+        return {"status": "error", "data": {}, "message": f"An error occurred: {e}"}
+
+def save_md_to_file(text: str, filename: str) -> dict:
+    """
+    Saves the given Markdown-formatted text to a .md file in the ./reports folder.
+
+    Args:
+        text (str): The Markdown-formatted text to save.
+        filename (str): The desired name of the file (e.g., "Model Context Protocols in Adaptive Transport Systems").
+            Special characters will be replaced with hyphens, and '.md' will be appended if not present.
+
+    Returns:
+        dict: A structured response with the following keys:
+            - 'status' (str): 'success' or 'error'.
+            - 'data' (str): The path to the saved file, or None if an error occurred.
+            - 'message' (str): A message describing the result or error.
+    """
+    try:
+        if not text or not isinstance(text, str):
+            return {"status": "error", "data": None, "message": "Invalid text provided."}
+        if not filename or not isinstance(filename, str):
+            return {"status": "error", "data": None, "message": "Invalid filename provided."}
+
+        filepath = save_markdown(text, filename)
+        return {"status": "success", "data": filepath, "message": "File saved successfully."}
+    except Exception as e:
+        return {"status": "error", "data": None, "message": f"An error occurred: {e}"}
+
+# The tools both servers register, in order
+TOOLS = [fetch_arxiv_papers, get_arxiv_abstract, get_arxiv_abstracts, save_md_to_file]
+
+def tools_version(functions: list) -> str:
+    """
+    Returns a short hash of the tool definitions the functions register as: name, description, input and output schema.
+    """
+    definitions = [
+        Tool.from_function(function).to_mcp_tool().model_dump(mode="json", include={"name", "description", "inputSchema", "outputSchema"})
+        for function in functions
+    ]
+    return hashlib.sha256(json.dumps(definitions, sort_keys=True).encode()).hexdigest()[:12]
+
+# Reported as the server version by both servers. Clients cache the tool list per server name and
+# version (see arxiv_core.session), so any change to a tool, its arguments or its docstring gives a new version.
+TOOLS_VERSION = tools_version(TOOLS)
@@ -0,0 +1,63 @@
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from arxiv_core.config import ARXIV_TRACES_FILE, OTEL_EXPORTER_OTLP_ENDPOINT
+from arxiv_core.log import get_logger
+
+# OpenTelemetry tracing from the Gemini agent, through the MCP client and server, down to the arXiv API.
+# The agent opens a span per message and per Gemini call, McpSession a client span per tool call, and the
+# server continues the same trace from the traceparent the client sends in the _meta field of tools/call.
+# Below that, the arxiv_core.api lookups, the arXiv HTTP requests and the report file writes get their own spans.
+#
+# USE COMMANDS:
+# ARXIV_TRACES_FILE=traces.jsonl python 8_mcp_docker_server.py
+# ARXIV_TRACES_FILE=traces.jsonl python 9_mcp_docker_gemini_agent.py
+# python bench/trace_report.py traces.jsonl
+#
+# Tracing is off, and every span a no-op, unless setup_tracing finds an exporter to send the spans to.
+
+tracer = trace.get_tracer("arxiv_core")
+
+def setup_tracing(service_name: str) -> bool:
+    """
+    Starts exporting the spans of this process, and returns True if tracing is on.
+
+    Spans are appended to ARXIV_TRACES_FILE as JSON lines, and sent to the OTLP/HTTP collector at
+    OTEL_EXPORTER_OTLP_ENDPOINT (e.g., http://localhost:4318 for Jaeger). With neither set, nothing changes.
+    """
+    exporters = []
+    if ARXIV_TRACES_FILE:
+        # One span per line; stdout is never used, since it carries the MCP messages of stdio servers
+        out = open(ARXIV_TRACES_FILE, "a", encoding="utf-8", buffering=1)
+        exporters.append(ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n"))
+    if OTEL_EXPORTER_OTLP_ENDPOINT:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            exporters.append(OTLPSpanExporter())
+        except ImportError:
+            get_logger("tracing").warning("OTEL_EXPORTER_OTLP_ENDPOINT is set, but opentelemetry-exporter-otlp-proto-http is not installed")
+    if not exporters:
+        return False
+
+    # The provider flushes the remaining spans when the process exits
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    for exporter in exporters:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return True
+
+def inject_meta() -> dict | None:
+    """
+    Returns the current trace context as MCP request metadata (traceparent, tracestate), or None if there is none.
+    """
+    carrier = {}
+    propagate.inject(carrier)
+    return carrier or None
+
+def extract_meta(meta) -> object:
+    """
+    Returns the trace context a client sent in the _meta field of an MCP request, to use as the parent of the server span.
+    """
+    carrier = meta.model_dump() if meta is not None else {}
+    return propagate.extract({key: value for key, value in carrier.items() if isinstance(value, str)})
@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Benchmark harness for the MCP servers.
+# Drives each tool of 4_mcp_server.py (stdio) and 8_mcp_docker_server.py (Streamable HTTP) at a fixed
+# concurrency against bench/mock_arxiv_server.py, and reports latency percentiles, requests per second,
+# and the CPU time and memory of the server processes. Results are written as JSON so runs can be compared.
+#
+# USE COMMANDS:
+# python bench/bench_mcp.py --requests 200 --concurrency 10 --output bench_results.json
+# python bench/bench_mcp.py --transports http --mock-latency 0.2 --compare bench_results.json
+# python bench/bench_mcp.py --mock-tail-rate 0.05 --hedge-percentile 95 --compare bench_results.json
+#
+# CPU and memory are read from /proc, so they are only reported on Linux.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastmcp.client.transports import PythonStdioTransport, StreamableHttpTransport
+from arxiv_core.session import McpSession
+
+TOOLS = ["fetch_arxiv_papers", "get_arxiv_abstract", "save_md_to_file"]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0):
+    """
+    Waits until `process` accepts connections on `port`. Raises if the process exits first.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{os.path.basename(process.args[1])} exited with code {process.returncode} before listening on port {port}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Nothing is listening on port {port} after {timeout} seconds")
+
+def process_tree(pid: int) -> list:
+    """
+    Returns the pid and the pids of all descendants of a process (Linux only).
+    """
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except OSError:
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+def process_usage(pids: list) -> dict:
+    """
+    Returns the total CPU seconds, resident memory and peak resident memory (MB) of the given processes.
+    """
+    cpu_seconds, rss, peak_rss = 0.0, 0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu_seconds += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("VmHWM:"):
+                        peak_rss += int(line.split()[1])
+        except OSError:
+            continue
+    return {"cpu_seconds": cpu_seconds, "rss_mb": rss / 1024, "peak_rss_mb": peak_rss / 1024}
+
+def percentile(values: list, p: float) -> float:
+    """
+    Returns the p-th percentile of sorted values, using the nearest-rank method.
+    """
+    index = max(0, min(len(values) - 1, math.ceil(p * len(values) / 100) - 1))
+    return values[index]
+
+def tool_arguments(tool: str, index: int, arxiv_ids: list, args) -> dict:
+    # Distinct arguments per request, so that request coalescing does not merge the calls
+    if tool == "fetch_arxiv_papers":
+        return {"topic": f"benchmark topic {index}", "number_of_papers": args.papers}
+    if tool == "get_arxiv_abstract":
+        return {"arxiv_id": arxiv_ids[index % len(arxiv_ids)]}
+    return {"text": "# Benchmark\n\n" + "Lorem ipsum dolor sit amet. " * 40, "filename": f"benchmark {index}"}
+
+async def run_tool(session: McpSession, tool: str, arxiv_ids: list, server_pids, args) -> dict:
+    """
+    Calls a tool args.requests times with args.concurrency calls in flight, and returns its statistics.
+    """
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def call(index: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            result = await session.call_tool(tool, tool_arguments(tool, index, arxiv_ids, args), raise_on_error=False)
+            latencies.append(time.perf_counter() - started)
+            if result.is_error or (result.structured_content or {}).get("status") != "success":
+                errors += 1
+
+    pids = server_pids()
+    usage_before = process_usage(pids) if sys.platform == "linux" else None
+    started = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    stats = {
+        "requests": args.requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(args.requests / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+    if usage_before is not None:
+        usage_after = process_usage(server_pids())
+        cpu_seconds = usage_after["cpu_seconds"] - usage_before["cpu_seconds"]
+        stats.update({
+            "server_cpu_seconds": round(cpu_seconds, 3),
+            "server_cpu_percent": round(cpu_seconds / elapsed * 100, 1),
+            "server_rss_mb": round(usage_after["rss_mb"], 1),
+            "server_peak_rss_mb": round(usage_after["peak_rss_mb"], 1),
+        })
+    return stats
+
+async def run_transport(transport_name: str, server_env: dict, workdir: str, args) -> dict:
+    """
+    Starts one server, runs every tool against it, and returns the statistics per tool.
+    """
+    http_server = None
+    if transport_name == "stdio":
+        transport = PythonStdioTransport(os.path.join(ROOT, "4_mcp_server.py"), env=server_env, cwd=workdir, keep_alive=False)
+        # The stdio server is a child of this process, next to the mock arXiv server
+        server_pids = lambda: [pid for pid in process_tree(os.getpid())[1:] if pid not in args.excluded_pids]
+    else:
+        # A free port, so a server already running on 1923 (e.g. the Docker container) is never benchmarked instead
+        http_port = free_port()
+        http_server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "8_mcp_docker_server.py"), "--port", str(http_port)],
+            env={**os.environ, **server_env}, cwd=workdir,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(http_port, http_server)
+        except Exception:
+            http_server.terminate()
+            http_server.wait()
+            raise
+        transport = StreamableHttpTransport(f"http://127.0.0.1:{http_port}")
+        server_pids = lambda: process_tree(http_server.pid)
+
+    try:
+        async with McpSession(transport) as session:
+            # Warm up the connection and the server, and collect IDs for get_arxiv_abstract
+            papers = await session.call_tool("fetch_arxiv_papers", {"topic": "benchmark warmup", "number_of_papers": 200})
+            arxiv_ids = [paper["arxiv_id"] for paper in papers.structured_content["data"]]
+            results = {}
+            for tool in args.tools:
+                results[tool] = await run_tool(session, tool, arxiv_ids, server_pids, args)
+                print_row(transport_name, tool, results[tool])
+            return results
+    finally:
+        if http_server is not None:
+            http_server.terminate()
+            http_server.wait()
+
+def print_row(transport_name: str, tool: str, stats: dict):
+    cpu = f"{stats['server_cpu_percent']:>6.1f}% {stats['server_peak_rss_mb']:>7.1f}MB" if "server_cpu_percent" in stats else ""
+    print(f"{transport_name:<6} {tool:<20} {stats['rps']:>8.1f} rps  p50 {stats['p50_ms']:>8.1f}ms  "
+          f"p95 {stats['p95_ms']:>8.1f}ms  p99 {stats['p99_ms']:>8.1f}ms  errors {stats['errors']:>4}  {cpu}")
+
+def compare(results: dict, baseline_path: str):
+    """
+    Prints the change in throughput and p95 latency against a previous results file.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"\nCompared to {baseline_path}:")
+    for transport_name, tools in results.items():
+        for tool, stats in tools.items():
+            old = baseline.get(transport_name, {}).get(tool)
+            if old is None:
+                continue
+            rps_change = (stats["rps"] - old["rps"]) / old["rps"] * 100
+            p95_change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            print(f"{transport_name:<6} {tool:<20} rps {rps_change:+7.1f}%  p95 {p95_change:+7.1f}%")
+
+async def main(args):
+    mock_port = free_port()
+    mock_server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "bench", "mock_arxiv_server.py"), "--port", str(mock_port),
+         "--latency", str(args.mock_latency), "--jitter", str(args.mock_jitter), "--error-rate", str(args.mock_error_rate),
+         "--tail-rate", str(args.mock_tail_rate), "--tail-latency", str(args.mock_tail_latency)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    args.excluded_pids = set(process_tree(mock_server.pid)) if sys.platform == "linux" else set()
+    try:
+        wait_for_port(mock_port, mock_server)
+        results = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            server_env = {
+                "ARXIV_API_URL": f"http://127.0.0.1:{mock_port}/api/query",
+                "ARXIV_CACHE_PATH": os.path.join(workdir, "cache", "arxiv_cache.sqlite3"),
+                # Every call goes to the mock arXiv server unless --cache is given
+                "ARXIV_CACHE_MAX_BYTES": str(50 * 1024 * 1024 if args.cache else 0),
+                "ARXIV_REQUEST_DELAY": "0",
+                "ARXIV_HEDGE_PERCENTILE": str(args.hedge_percentile),
+            }
+            for transport_name in args.transports:
+                results[transport_name] = await run_transport(transport_name, server_env, workdir, args)
+    finally:
+        mock_server.terminate()
+        mock_server.wait()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {name: getattr(args, name) for name in (
+            "requests", "concurrency", "papers", "cache", "mock_latency", "mock_jitter", "mock_error_rate",
+            "mock_tail_rate", "mock_tail_latency", "hedge_percentile", "tools", "transports")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the MCP server tools over stdio and Streamable HTTP")
+    parser.add_argument("--transports", nargs="+", choices=["stdio", "http"], default=["stdio", "http"])
+    parser.add_argument("--tools", nargs="+", choices=TOOLS, default=TOOLS)
+    parser.add_argument("--requests", type=int, default=200, help="Calls per tool and transport")
+    parser.add_argument("--concurrency", type=int, default=10, help="Calls in flight at once")
+    parser.add_argument("--papers", type=int, default=10, help="number_of_papers for fetch_arxiv_papers")
+    parser.add_argument("--cache", action="store_true", help="Keep the servers' arXiv cache enabled")
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="Latency of the mock arXiv server in seconds")
+    parser.add_argument("--mock-jitter", type=float, default=0.0)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-tail-rate", type=float, default=0.0, help="Share of slow outliers of the mock arXiv server")
+    parser.add_argument("--mock-tail-latency", type=float, default=1.0)
+    parser.add_argument("--hedge-percentile", type=float, default=0.0, help="ARXIV_HEDGE_PERCENTILE of the servers (0 = no hedging)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+# Micro-benchmarks for parsing arXiv Atom feeds into papers.
+# Compares the per-entry loop the tools started with (wildcard "{*}" lookups and a next(...) scan over
+# the links), the same loop with pre-compiled namespaced tags, the single-pass loop of arxiv_core.parser,
+# the streaming AtomFeedParser the tools use now, and lxml if it is installed. Feeds of 10 to 10,000
+# entries are rendered by bench/mock_arxiv_server.py, so they have the layout of real arXiv responses.
+#
+# USE COMMANDS:
+# python bench/bench_parser.py
+# python bench/bench_parser.py --sizes 100 1000 --output parser_results.json
+#
+# Peak memory is measured with tracemalloc, which does not see memory allocated inside lxml.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from arxiv_core.parser import AUTHOR, ENTRY, ID, LINK, NAME, PUBLISHED, TITLE, AtomFeedParser, iter_entries, paper_from_entry, read_chunks
+from mock_arxiv_server import FEED_HEADER, generate_corpus, render_entry
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+def make_feed(size: int) -> bytes:
+    papers = generate_corpus(size, abstract_words=180, seed=0)
+    body = FEED_HEADER.format(query="benchmark", total=size, start=0, count=size)
+    body += "".join(render_entry(paper) for paper in papers) + "</feed>\n"
+    return body.encode("utf-8")
+
+def parse_wildcard(raw: bytes) -> list:
+    # The loop the tools started with
+    root = ET.fromstring(raw)
+    papers = []
+    for entry in root.findall(".//{*}entry"):
+        full_id = entry.findtext("{*}id")
+        papers.append({
+            'arxiv_id': full_id.split("/")[-1] if full_id else None,
+            'title': entry.findtext("{*}title"),
+            'authors': [a.findtext("{*}name") for a in entry.findall("{*}author")],
+            'published': entry.findtext("{*}published"),
+            'pdf_link': next((l.get("href") for l in entry.findall("{*}link") if l.get("type") == "application/pdf"), None),
+        })
+    return papers
+
+def parse_namespaced(raw: bytes) -> list:
+    # The same loop with pre-compiled, fully qualified tag names
+    root = ET.fromstring(raw)
+    papers = []
+    for entry in root.iter(ENTRY):
+        full_id = entry.findtext(ID)
+        papers.append({
+            'arxiv_id': full_id.split("/")[-1] if full_id else None,
+            'title': entry.findtext(TITLE),
+            'authors': [a.findtext(NAME) for a in entry.iterfind(AUTHOR)],
+            'published': entry.findtext(PUBLISHED),
+            'pdf_link': next((l.get("href") for l in entry.iterfind(LINK) if l.get("type") == "application/pdf"), None),
+        })
+    return papers
+
+def parse_single_pass(raw: bytes) -> list:
+    # Whole document, one pass over the children of each entry
+    return [paper_from_entry(entry).to_dict() for entry in ET.fromstring(raw).iter(ENTRY)]
+
+def parse_streaming(raw: bytes) -> list:
+    # What the tools use now: incremental parsing of the response chunks
+    return [paper.to_dict() for paper in iter_entries(read_chunks(io.BytesIO(raw)))]
+
+def parse_lxml(raw: bytes) -> list:
+    return [paper_from_entry(entry).to_dict() for entry in lxml_etree.fromstring(raw).iter(ENTRY)]
+
+class LxmlFeedParser(AtomFeedParser):
+    def __init__(self, entry_fn=paper_from_entry):
+        super().__init__(entry_fn)
+        self._parser = lxml_etree.XMLPullParser(events=("start", "end"))
+
+def parse_lxml_streaming(raw: bytes) -> list:
+    parser = LxmlFeedParser()
+    papers = []
+    for chunk in read_chunks(io.BytesIO(raw)):
+        papers.extend(parser.feed(chunk))
+    papers.extend(parser.close())
+    return [paper.to_dict() for paper in papers]
+
+PARSERS = {
+    "etree_wildcard": parse_wildcard,
+    "etree_namespaced": parse_namespaced,
+    "etree_single_pass": parse_single_pass,
+    "etree_streaming": parse_streaming,
+}
+if lxml_etree is not None:
+    PARSERS["lxml_single_pass"] = parse_lxml
+    PARSERS["lxml_streaming"] = parse_lxml_streaming
+
+def measure(parse, raw: bytes, min_time: float) -> dict:
+    """
+    Parses the feed repeatedly for at least `min_time` seconds and returns the timings and peak memory.
+    """
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < 3 or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        parse(raw)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    parse(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "runs": len(timings),
+        "best_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+def main(args):
+    results = {}
+    for size in args.sizes:
+        raw = make_feed(size)
+        expected = parse_wildcard(raw)
+        print(f"\n{size} entries ({len(raw) / 1024:.0f} KB)")
+        results[size] = {}
+        for name, parse in PARSERS.items():
+            if parse(raw) != expected:
+                raise AssertionError(f"{name} does not return the same papers as etree_wildcard")
+            stats = measure(parse, raw, args.min_time)
+            stats["entries_per_second"] = round(size / (stats["median_ms"] / 1000))
+            results[size][name] = stats
+            print(f"  {name:<18} median {stats['median_ms']:>10.3f}ms  best {stats['best_ms']:>10.3f}ms  "
+                  f"{stats['entries_per_second']:>9} entries/s  peak {stats['peak_kb']:>9.1f}KB")
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "lxml": lxml_etree is not None,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the arXiv Atom feed parsers")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000], help="Entries per feed")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend on each parser and size")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    main(parser.parse_args())
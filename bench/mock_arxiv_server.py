@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import hashlib
+import random
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+# Local stand-in for the arXiv API (http://export.arxiv.org/api/query), for offline load tests and benchmarks.
+# It answers the same search_query/start/max_results and id_list queries with Atom feeds shaped like
+# arXiv's, from a fixture corpus, with configurable latency, error rate and response size.
+#
+# USE COMMANDS:
+# python bench/mock_arxiv_server.py --port 8090 --latency 0.2 --error-rate 0.01
+# python bench/mock_arxiv_server.py --port 8090 --latency 0.05 --tail-rate 0.05 --tail-latency 2   (slow outliers)
+# ARXIV_API_URL=http://localhost:8090/api/query python 8_mcp_docker_server.py
+#
+# By default the corpus is generated from a fixed seed, so every run serves the same papers.
+# Pass --corpus with Atom feeds saved from the real API to serve real papers instead, e.g.
+# curl -o mcp.xml "http://export.arxiv.org/api/query?search_query=all:mcp&max_results=500"
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+FEED_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    '  <link href="http://arxiv.org/api/query" rel="self" type="application/atom+xml"/>\n'
+    '  <title type="html">ArXiv Query: {query}</title>\n'
+    '  <id>http://arxiv.org/api/mock</id>\n'
+    '  <updated>2025-01-01T00:00:00-05:00</updated>\n'
+    '  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{total}</opensearch:totalResults>\n'
+    '  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{start}</opensearch:startIndex>\n'
+    '  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{count}</opensearch:itemsPerPage>\n'
+)
+
+WORDS = (
+    "model context protocol agent tool retrieval augmented generation language large reasoning "
+    "benchmark evaluation security privacy federated learning graph neural network transformer "
+    "attention diffusion reinforcement policy optimization robust adversarial multimodal vision "
+    "planning memory latency throughput distributed inference training dataset alignment safety "
+    "interpretability efficient sparse quantization scaling compression orchestration workflow"
+).split()
+
+FIRST_NAMES = "Alice Bo Chen Deniz Elif Farid Grace Hiro Ines Jonas Kemal Lena Mehmet Nora Omar Priya".split()
+LAST_NAMES = "Smith Wang Yilmaz Garcia Kaya Muller Tanaka Rossi Novak Sato Demir Kim Silva Ahmed Lee".split()
+
+def generate_corpus(size: int, abstract_words: int, seed: int) -> list:
+    """
+    Generates a deterministic corpus of papers with arXiv-like IDs, titles, authors and abstracts, newest first.
+    """
+    rng = random.Random(seed)
+    papers = []
+    for i in range(size):
+        # Newest papers get the highest IDs, as in arXiv's submittedDate ordering
+        number = size - i
+        month = 12 - (i * 12 // size)
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize()
+        papers.append({
+            "arxiv_id": f"25{month:02d}.{number:05d}v{rng.randint(1, 3)}",
+            "title": title,
+            "summary": " ".join(rng.choice(WORDS) for _ in range(abstract_words)).capitalize() + ".",
+            "authors": [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(rng.randint(1, 8))],
+            "published": f"2025-{month:02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+        })
+    return papers
+
+def load_corpus(paths: list) -> list:
+    """
+    Loads papers from Atom feeds saved from the arXiv API.
+    """
+    papers = []
+    for path in paths:
+        for entry in ET.parse(path).getroot().iter(ATOM_NS + "entry"):
+            papers.append({
+                "arxiv_id": entry.findtext(ATOM_NS + "id", "").split("/abs/")[-1],
+                "title": entry.findtext(ATOM_NS + "title", ""),
+                "summary": entry.findtext(ATOM_NS + "summary", ""),
+                "authors": [author.findtext(ATOM_NS + "name", "") for author in entry.iter(ATOM_NS + "author")],
+                "published": entry.findtext(ATOM_NS + "published", ""),
+            })
+    return papers
+
+def render_entry(paper: dict) -> str:
+    """
+    Renders a paper as an Atom entry in the layout of the arXiv API.
+    """
+    arxiv_id = paper["arxiv_id"]
+    authors = "".join(f"    <author>\n      <name>{escape(name)}</name>\n    </author>\n" for name in paper["authors"])
+    return (
+        "  <entry>\n"
+        f"    <id>http://arxiv.org/abs/{arxiv_id}</id>\n"
+        f"    <updated>{paper['published']}</updated>\n"
+        f"    <published>{paper['published']}</published>\n"
+        f"    <title>{escape(paper['title'])}</title>\n"
+        f"    <summary>  {escape(paper['summary'])}\n</summary>\n"
+        f"{authors}"
+        f'    <link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>\n'
+        f'    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>\n'
+        '    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>\n'
+        '    <category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>\n'
+        "  </entry>\n"
+    )
+
+def create_app(corpus: list, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0,
+               tail_rate: float = 0.0, tail_latency: float = 0.0) -> Starlette:
+    """
+    Creates the mock arXiv API app serving `corpus`.
+
+    Every response waits `latency` seconds, plus a uniform random delay of up to `jitter` seconds,
+    before the first byte. A share of `tail_rate` requests waits `tail_latency` seconds more, to model the
+    slow outliers that hedged requests target. A share of `error_rate` requests fail with 503 and a Retry-After header,
+    as the real API does when it is overloaded. Searches match the whole corpus, newest first.
+
+    Responses carry an ETag and a Last-Modified header, and conditional requests whose If-None-Match matches
+    the ETag are answered with 304 Not Modified, so cache revalidation can be tested offline.
+    """
+    rng = random.Random(seed)
+    by_id = {}
+    for paper in corpus:
+        by_id[paper["arxiv_id"]] = paper
+        by_id[paper["arxiv_id"].rsplit("v", 1)[0]] = paper
+
+    async def query(request):
+        delay = latency + rng.uniform(0, jitter)
+        if rng.random() < tail_rate:
+            delay += tail_latency
+        await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            return Response("Service Unavailable", status_code=503, headers={"Retry-After": "1"})
+
+        params = request.query_params
+        # The corpus never changes while the server runs, so a response only depends on its query
+        validators = {
+            "ETag": '"' + hashlib.sha1(f"{request.url.query}|{len(corpus)}".encode()).hexdigest()[:16] + '"',
+            "Last-Modified": "Wed, 01 Jan 2025 05:00:00 GMT",
+        }
+        if request.headers.get("If-None-Match") == validators["ETag"]:
+            return Response(status_code=304, headers=validators)
+
+        if params.get("id_list"):
+            ids = params["id_list"].split(",")
+            papers = [by_id[arxiv_id] for arxiv_id in ids if arxiv_id in by_id]
+            total = len(papers)
+            start = 0
+        else:
+            start = int(params.get("start", 0))
+            max_results = int(params.get("max_results", 10))
+            papers = corpus[start:start + max_results]
+            total = len(corpus)
+        papers = papers[:int(params.get("max_results", len(papers)))]
+
+        async def body():
+            yield FEED_HEADER.format(query=escape(str(params)), total=total, start=start, count=len(papers))
+            for paper in papers:
+                yield render_entry(paper)
+            yield "</feed>\n"
+
+        return StreamingResponse(body(), media_type="application/atom+xml; charset=utf-8", headers=validators)
+
+    return Starlette(routes=[Route("/api/query", query)])
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock arXiv API server for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first byte of every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Share of requests that are slow outliers (0-1)")
+    parser.add_argument("--tail-latency", type=float, default=1.0, help="Extra seconds of the slow outliers")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail with 503 (0-1)")
+    parser.add_argument("--corpus", nargs="*", default=[], help="Atom feeds saved from the arXiv API to serve")
+    parser.add_argument("--corpus-size", type=int, default=5000, help="Number of generated papers if no --corpus is given")
+    parser.add_argument("--abstract-words", type=int, default=180, help="Abstract length of generated papers, in words")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.corpus_size, args.abstract_words, args.seed)
+    app = create_app(corpus, args.latency, args.jitter, args.error_rate, args.seed, args.tail_rate, args.tail_latency)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,64 @@
+import argparse
+import json
+from datetime import datetime
+
+# Prints the slowest traces written to ARXIV_TRACES_FILE (see arxiv_core.tracing) as span trees.
+# Give the files of both the agent and the server: their spans share trace IDs, so every request shows up
+# as one tree from the Gemini calls down to the arXiv requests, with the time each span spent outside its children.
+#
+# USE COMMANDS:
+# python bench/trace_report.py agent_traces.jsonl server_traces.jsonl --slowest 3
+
+def load_spans(paths: list) -> dict:
+    """
+    Reads the spans of one or more ARXIV_TRACES_FILE files and groups them by trace ID.
+    """
+    traces = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    span = json.loads(line)
+                    traces.setdefault(span["context"]["trace_id"], []).append(span)
+    return traces
+
+def print_trace(spans: list):
+    """
+    Prints the spans of one trace as a tree, with the duration of each span and the time it spent outside its children.
+    """
+    for span in spans:
+        span["start"] = datetime.fromisoformat(span["start_time"])
+        span["duration"] = (datetime.fromisoformat(span["end_time"]) - span["start"]).total_seconds()
+    by_id = {span["context"]["span_id"]: span for span in spans}
+    children = {}
+    for span in spans:
+        children.setdefault(span["parent_id"] if span["parent_id"] in by_id else None, []).append(span)
+
+    def show(span: dict, depth: int):
+        kids = sorted(children.get(span["context"]["span_id"], []), key=lambda kid: kid["start"])
+        # Concurrent children can overlap, so the time outside them is never reported below zero
+        self_time = max(0.0, span["duration"] - sum(kid["duration"] for kid in kids))
+        service = span["resource"]["attributes"].get("service.name", "")
+        print(f"{span['duration'] * 1000:>10.1f}ms  self {self_time * 1000:>9.1f}ms  {'  ' * depth}{span['name']}  [{service}]")
+        for kid in kids:
+            show(kid, depth + 1)
+
+    for root in sorted(children.get(None, []), key=lambda span: span["start"]):
+        show(root, 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the traces written to ARXIV_TRACES_FILE as span trees")
+    parser.add_argument("paths", nargs="+", help="Trace files of the agent and the server")
+    parser.add_argument("--slowest", type=int, default=5, help="Number of traces to print, slowest first")
+    args = parser.parse_args()
+
+    traces = load_spans(args.paths)
+
+    def trace_duration(spans: list) -> float:
+        starts = [datetime.fromisoformat(span["start_time"]) for span in spans]
+        ends = [datetime.fromisoformat(span["end_time"]) for span in spans]
+        return (max(ends) - min(starts)).total_seconds()
+
+    for trace_id, spans in sorted(traces.items(), key=lambda item: trace_duration(item[1]), reverse=True)[:args.slowest]:
+        print(f"\nTrace {trace_id} ({trace_duration(spans) * 1000:.1f}ms)")
+        print_trace(spans)